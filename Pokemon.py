@@ -1,34 +1,14 @@
+import argparse
+import collections
 import tkinter as tk
-from tkinter import messagebox
-from tkinter import simpledialog
-from tkinter import filedialog, dialog
 import traceback
 import random
-import json
+from time import monotonic, perf_counter
 
 import os
 
-ALPHA = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-UP = "up"
-DOWN = "down"
-LEFT = "left"
-RIGHT = "right"
-DIRECTIONS = (UP, DOWN, LEFT, RIGHT,
-              f"{UP}-{LEFT}", f"{UP}-{RIGHT}",
-              f"{DOWN}-{LEFT}", f"{DOWN}-{RIGHT}")
-WALL_VERTICAL = "|"
-WALL_HORIZONTAL = "-"
-POKEMON = "☺"
-FLAG = "♥"
-UNEXPOSED = "~"
-EXPOSED = "0"
-INVALID = "That ain't a valid action buddy."
-HELP_TEXT = """h - Help.
-<Uppercase Letter><number> - Selecting a cell (e.g. 'A1')
-f <Uppercase Letter><number> - Placing flag at cell (e.g. 'f A1')
-:) - Restart game.
-q - Quit.
-"""
+from pokemon_core import (BoardModel, NoGuessBoard, History, FLAG, POKEMON, EVENT_POKEMON, EVENT_WON, EVENT_LOST,
+                          LEVELS, level_board)
 
 TASK_ONE = 1
 TASK_TWO = 2
@@ -39,315 +19,37 @@ IMAGE_MATCH = ['zero_adjacent', 'one_adjacent', 'two_adjacent', 'three_adjacent'
 
 IMAGE_POKEMON = ['charizard', 'cyndaquil', 'pikachu', 'psyduck', 'togepi', 'umbreon']
 
-
-class BoardModel(object):
-    '''
-    To stimulate the internal process of the pokemon game
-    '''
-
-    def __init__(self, grid_size, num_pokemon):
-        '''
-        To construct a BoardModel class to complete the internal process of the pokemon game
-
-        :param grid_size: the size of the game. it is related to the number of tile
-        :param num_pokemon: refer to the number of pokemon hidden in the game board
-
-        Attribution:
-            displayBoard: the board would be showed in the window. it is a two-dimensional list
-            num_pokemon: record the number of pokemon hidden in the board
-            left_pokemon: record the number of rest pokemon hidden in the board
-            state: determine if the game stop
-            loss: determine if the player loss in the game
-            isWorking:  determine if the game board can be changed
-            grid_size: the size the game board
-            pokemon: a list of pokemon's positions
-            hidden_pokemon: a list of pokemon that still hide
-        '''
-        self.displayBoard = [[UNEXPOSED for col in range(grid_size)] for row in range(grid_size)]
-        self.num_pokemon = self.left_pokemon = num_pokemon
-        self.state = True
-        self.loss = False
-        self.isWorking = True
-        self.grid_size = grid_size
-        self.pokemon = self.generate_pokemon(grid_size, num_pokemon)
-        self.hidden_pokemon = self.pokemon.copy()
-
-    def get_board(self):
-        '''
-        :return: the attribution: displayBoard
-        '''
-        return self.displayBoard
-
-    def get_left_pokemon(self):
-        '''
-        :return: the attribution: left_pokemon
-        '''
-        return self.left_pokemon
-
-    def get_num_pokemon(self):
-        '''
-        :return: the attribution: num_pokemon
-        '''
-        return self.num_pokemon
-
-    def get_game(self):
-        '''
-        :return: the attribution: state
-        '''
-        return self.state
-
-    def get_pokemon_location(self):
-        '''
-        :return: the attribution: pokemon
-        '''
-        return self.pokemon
-
-    def get_num_attempted_catches(self):
-        '''
-
-        :return: the number of catches were used on the board
-        '''
-        return self.num_pokemon - self.left_pokemon
-
-    def get_item(self, position: tuple):
-        '''
-        :param position: a tuple that like (x, y)
-        :return: the content of the position on the board
-        '''
-        return self.displayBoard[position[0]][position[1]]
-
-    def generate_pokemon(self, grid_size, num_pokemon):
-        '''
-        The method is used to randomly generate the list of pokemon hidden in the game board
-        the list records the index
-
-        :param grid_size: the size of the board
-        :param num_pokemon:  the number of pokemon generate on the board
-        :return: randomly generate a list that records the index of every pokemon
-        '''
-        assert num_pokemon <= grid_size ** 2
-        pokemon = random.sample(range(0, grid_size ** 2), num_pokemon)
-        return pokemon
-
-    def set_state(self, Boolean):
-        '''
-        Set the state of the game
-
-        :param Boolean: True or False
-        '''
-        self.state = Boolean
-
-    def triggle_isworking(self, Bool):
-        '''
-        Set the attribution isWorking of the game
-
-        :param Bool: True or False
-        '''
-        self.isWorking = Bool
-
-    def is_on_board(self, position):
-        '''
-        To ensure the input position is within the board
-
-        :param position: a tuple like (x, y)
-        :return: if the positon is within the board return True else return False
-        '''
-
-        x, y = position
-        if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
-            return True
-        else:
-            return False
-
-    def reset_game(self):
-        '''
-        To re-generate a new game. It will generate the important parameter of BoardModel
-        '''
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                self.displayBoard[i][j] = '~'
-        self.state = True
-        self.left_pokemon = self.num_pokemon
-        self.loss = False
-        self.triggle_isworking(True)
-        self.hidden_pokemon = self.pokemon.copy()
-
-    def calculate_count(self, position: tuple):
-        '''
-        calculate how many pokemon surrounding the item in the position
-        :param position: a tuple like (x, y)
-        :return: the number of pokemon surrounding the position
-        '''
-
-        count = 0
-        index = self.position_to_index(position)
-        x, y = position
-
-        assert index not in self.pokemon
-
-        def is_poke(position):
-            if self.is_on_board(position):
-                if self.position_to_index(position) in self.pokemon:
-                    return True
-            return False
-
-        if is_poke((x-1, y-1)):
-            count += 1
-        if is_poke((x, y -1)):
-            count += 1
-        if is_poke((x+1, y-1)):
-            count += 1
-        if is_poke((x + 1, y)):
-            count += 1
-        if is_poke((x-1, y)):
-            count += 1
-        if is_poke((x, y+1)):
-            count += 1
-        if is_poke((x-1, y+1)):
-            count += 1
-        if is_poke((x+1, y+1)):
-            count += 1
-        return count
-
-    def left_click(self, position: tuple):
-        '''
-        To complete the operation in the game. left click would expose the number of pokemon surrounding the position
-        However, if a pokemon hide in the position, player would lose the game
-
-        :param position: a tuple like (x, y)
-        '''
-
-        assert self.is_on_board(position)
-        if self.isWorking:
-            if self.position_to_index(position) not in self.pokemon:
-                if self.get_item(position) == '~':
-                    statistic = self.calculate_count(position)
-                    self.set_item(position, str(statistic))
-                    if statistic == 0:
-                        self.extend_zero(position, position)
-            else:
-                self.loss = True
-                self.show_all_pokemon()
-
-    def right_click(self, position: tuple):
-        '''
-        To complete the operation in the game. right click would use a catch to cover the grass. if player cover
-        all the pokemon accurately, they would win the game
-        :param position: a tuple like (x, y)
-        '''
-        assert position[0] < self.grid_size
-        assert position[1] < self.grid_size
-        if self.isWorking:
-            index = self.position_to_index(position)
-            if self.get_item(position) == '~':
-                self.set_item(position, FLAG)
-                self.left_pokemon -= 1
-
-                if index in self.pokemon:
-                    self.hidden_pokemon.remove(index)
-                self.check_win()
-            elif self.get_item(position) == FLAG:
-                self.set_item(position, '~')
-                self.left_pokemon += 1
-                if index in self.pokemon:
-                    self.hidden_pokemon.append(index)
-
-    def extend_zero(self, current_position, pre_position):
-        '''
-        if players left click a tile which is zero, the method would extend other zero tiles connecting to that zero
-        title until not zero title
-
-        :param current_position: the current zero tile position
-        :param pre_position: the last zero tile position
-        :return:
-        '''
-
-        x, y = current_position
-        if not self.is_on_board(current_position):
-            return
-        if self.calculate_count(current_position) != 0:
-            self.left_click(current_position)
-            return
-        else:
-            self.set_item(current_position, EXPOSED)
-            UP, DOWN, LEFT, RIGHT = (x-1, y), (x + 1, y), (x, y-1), (x, y+1)
-            if self.is_on_board(UP) and self.get_item(UP) == '~':
-                self.extend_zero(UP, current_position)
-            if self.is_on_board(DOWN) and self.get_item(DOWN) == '~':
-                self.extend_zero(DOWN, current_position)
-            if self.is_on_board(LEFT) and self.get_item(LEFT) == '~':
-                self.extend_zero(LEFT, current_position)
-            if self.is_on_board(RIGHT) and self.get_item(RIGHT) == '~':
-                self.extend_zero(RIGHT, current_position)
-
-    def position_to_index(self, position):
-        '''
-        covert two-dimensional list to one-dimensional list
-
-        :param position: a tuple like (x, y)
-        :return: the corresponding index in one-dimensional list
-        '''
-        x, y = position
-        index = x * self.grid_size + y
-        return index
-
-    def index_to_position(self, index):
-        '''
-        covert one-dimensional list to two-dimensional list
-        :param index: a number in one-dimensional list
-        :return: the corresponding position in two-dimensional list
-        '''
-        x = index // self.grid_size
-        y = index % self.grid_size
-        return (x, y)
-
-    def set_item(self, position: tuple, symbol):
-        '''
-        to change the symbol on the corresponding position
-        :param position: a tuple like (x, y)
-        :param symbol: a global variable
-        '''
-        x, y = position
-        self.displayBoard[x][y] = symbol
-
-    # the method is only used when game over
-    def show_all_pokemon(self):
-        '''
-        when game over, the method would show all the position of pokemon
-        '''
-        for i in self.pokemon:
-            self.set_item(self.index_to_position(i), POKEMON)
-
-    def check_win(self):
-        '''
-        to check if the players win the game
-        :return: if it is win would return True, if not, it return False
-        '''
-        if len(self.hidden_pokemon) == 0 and self.left_pokemon == 0 and self.state:
-            self.show_all_pokemon()
-            self.isWorking = False
-            return True
-        else:
-            return False
-
-    def check_lose(self):
-        '''
-        to check if the players lose the game
-        :return: if it is loss would return True, if not, it return False
-        '''
-        if self.loss and self.state:
-            self.isWorking = False
-            return True
-        else:
-            return False
-
-    def __str__(self):
-        matrix = ''
-        for i in self.displayBoard:
-            matrix += str(i)
-            matrix += '\n'
-        return matrix
-
+IMAGE_DIRECTORIES = ('images', 'images/pokemon_sprites')
+IMAGE_FORMATS = ('.png', '.gif')
+# the file extension of saved games. the old saved games were .txt files
+SAVE_EXTENSION = '.pkm'
+# the snapshot of autosave. its journal is next to it
+AUTOSAVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'autosave' + SAVE_EXTENSION)
+# the database of the high scores
+SCORES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scores.db')
+# the number of high scores showed
+TOP_SCORES = 3
+# the file extension of recorded games
+REPLAY_EXTENSION = '.pkr'
+# new games are generated from a random seed below it, so they could be replayed
+SEED_RANGE = 2 ** 32
+
+# the size in pixel of a tile drawn on the canvas. it is the size of the tile images
+TILE_WIDTH = 63
+TILE_HEIGHT = 60
+# the biggest canvas in pixel. bigger boards are scrolled
+VIEWPORT_WIDTH = 945
+VIEWPORT_HEIGHT = 720
+# the number of tiles drawn around the visible window of a scrolled board
+VIEWPORT_MARGIN = 2
+# the most frames in a second of animations, and how long a frame of the wave of grass is showed in millisecond
+ANIMATION_FPS = 30
+WAVE_PERIOD = 200
+# the debug panel is showed when it is set to 1
+DEBUG_ENVIRONMENT = 'POKEMON_DEBUG'
+# the milliseconds between two probes of the debug panel, and the number of recent probes whose worst lag is showed
+PROBE_INTERVAL = 250
+PROBE_WINDOW = 20
 
 '''
     The part would complete graphical board of Pokemon Game 
@@ -365,6 +67,9 @@ class StatusBar(tk.Frame):
         game: a BoardModel class that is running
         state: determine if the StatusBar would continually update
         frames: a collection of all the frames used in the class
+        labels: the components showing the number of left pokemon and catches
+        start: the monotonic clock when the timer would be zero
+        timer: the identifier of the scheduled timepiece
 
     '''
 
@@ -385,8 +90,14 @@ class StatusBar(tk.Frame):
         self.game = game
         self.state = True
         self.frames = []
+        self.labels = ()
+        self.start = monotonic() - time
+        self.timer = None
         self.draw_pokemon_info()
         self.draw_timer()
+        self.game.subscribe(EVENT_POKEMON, self.refresh)
+        self.game.subscribe(EVENT_WON, self.stop)
+        self.game.subscribe(EVENT_LOST, self.stop)
 
     def get_state(self):
         '''
@@ -407,6 +118,8 @@ class StatusBar(tk.Frame):
         set the value of state
         :param Bool: True or False
         '''
+        if not Bool:
+            self.stop()
         self.state = Bool
 
     def set_time(self, time):
@@ -415,6 +128,7 @@ class StatusBar(tk.Frame):
         :param time: a positive number
         '''
         self.time = time
+        self.start = monotonic() - time
 
     def draw_pokemon_info(self):
         '''
@@ -438,6 +152,7 @@ class StatusBar(tk.Frame):
         text_pokemon_left.pack(side=tk.TOP)
         text_catches.pack(side=tk.BOTTOM)
 
+        self.labels = (text_pokemon_left, text_catches)
         self.update_data(text_pokemon_left, text_catches)
 
         self.frames.append(frame)
@@ -462,55 +177,77 @@ class StatusBar(tk.Frame):
         recording.pack(side=tk.BOTTOM)
 
         numberM = tk.Label(recording, text=self.time//60)
-        numberM.pack(side=LEFT)
+        numberM.pack(side=tk.LEFT)
 
         minute = tk.Label(recording, text='m ')
-        minute.pack(side=LEFT)
+        minute.pack(side=tk.LEFT)
 
         numberS = tk.Label(recording, text=self.time%60)
         numberS.pack(side=tk.LEFT)
 
         second = tk.Label(recording, text='s ')
-        second.pack(side=RIGHT)
+        second.pack(side=tk.RIGHT)
 
         self.frames.append(timerFrame)
 
-        self.timepiece(numberM, numberS, self.time)
+        self.timepiece(numberM, numberS)
 
     def update_data(self, left_pokemon, attempted_catches):
         '''
-        the method to update data about pokemon and catches in real time
+        the method to update data about pokemon and catches
         :param left_pokemon: the pokemon component
         :param attempted_catches: the catches component
         :return:
         '''
         left_pokemon.config(text=f'Left Pokemon: {self.game.get_left_pokemon()}')
         attempted_catches.config(text=f'Attempted Catches: {self.game.get_num_attempted_catches()}')
-        self.master.after(100, self.update_data, left_pokemon, attempted_catches)
 
-    def timepiece(self, minute, second, time):
+    def refresh(self):
+        '''
+        update data about pokemon and catches when the game publishes the number of left pokemon changed
         '''
-        the mothed was designed to reckon by time
+        self.update_data(*self.labels)
+
+    def timepiece(self, minute, second):
+        '''
+        the mothed was designed to reckon by time. the time is read from a monotonic clock
+        and the next update is scheduled at the next whole second
         :param minute: the number of minute
         :param second: the number of second
-        :param time: the time in second
         '''
+        self.timer = None
         try:
-            if self.state:
-                if time < 60:
-                    second['text'] = time
-                else:
-                    minute['text'] = time // 60
-                    second['text'] = time % 60
-                    # time = 0
-                self.master.after(1000, self.timepiece, minute, second, time + 1)
-                # self.time = minute['text'] * 60 + time
-                self.time = time
+            if self.state and self.game.isWorking:
+                elapsed = monotonic() - self.start
+                self.time = int(elapsed)
+                minute['text'] = self.time // 60
+                second['text'] = self.time % 60
+                self.timer = self.master.after(int((1 - elapsed % 1) * 1000) + 1, self.timepiece, minute, second)
             else:
                 self.state = False
-                # self.redraw()
-        except Exception as e:
-            traceback.print_exc(e)
+        except Exception:
+            traceback.print_exc()
+
+    def stop(self):
+        '''
+        stop the timer when the game is not running
+        '''
+        if self.state:
+            self.time = int(monotonic() - self.start)
+        self.state = False
+        if self.timer is not None:
+            self.master.after_cancel(self.timer)
+            self.timer = None
+
+    def destroy(self):
+        '''
+        stop the timer and stop waiting for the events of the game before the StatusBar is destroyed
+        '''
+        self.stop()
+        self.game.unsubscribe(EVENT_POKEMON, self.refresh)
+        self.game.unsubscribe(EVENT_WON, self.stop)
+        self.game.unsubscribe(EVENT_LOST, self.stop)
+        super().destroy()
 
     def redraw(self):
         '''
@@ -520,6 +257,174 @@ class StatusBar(tk.Frame):
             i.destroy()
 
 
+class DebugPanel(tk.Frame):
+    '''
+    An optional frame next to the StatusBar showing the lag of the event loop of Tk. a probe is scheduled by after
+    every some milliseconds, and its lag is how late it runs after its schedule. the probe also shows the number of
+    after callbacks waiting and the redraw time of the last click
+
+    Attribution:
+        board: the BoardView whose last redraw is showed
+        interval: the milliseconds between two probes
+        lags: the lags of the recent probes in second
+        expected: the monotonic clock when the next probe should run
+        probe: the identifier of the scheduled probe
+        label: the component showing the numbers
+        text: the text showed by the label
+    '''
+
+    def __init__(self, master, board, interval=PROBE_INTERVAL, *args, **kwargs):
+        '''
+        To construct the DebugPanel class
+
+        :param master: the super component
+        :param board: the BoardView of the game
+        :param interval: the milliseconds between two probes
+        :param args: other parameters
+        :param kwargs: other parameters
+        '''
+        super().__init__(master, *args, **kwargs)
+        self.board = board
+        self.interval = interval
+        self.lags = collections.deque(maxlen=PROBE_WINDOW)
+        self.expected = None
+        self.probe = None
+        self.text = ''
+        self.label = tk.Label(self, text=self.text, anchor='w', justify='left', font='TkFixedFont')
+        self.label.pack(side=tk.LEFT)
+        self.schedule()
+
+    def schedule(self):
+        '''
+        schedule the next probe
+        '''
+        self.expected = monotonic() + self.interval / 1000
+        self.probe = self.after(self.interval, self.tick)
+
+    def pending(self):
+        '''
+        :return: the number of after callbacks waiting in Tk
+        '''
+        return len(self.tk.splitlist(self.tk.call('after', 'info')))
+
+    def tick(self):
+        '''
+        measure the lag of the probe and update the numbers. the label is only changed if the text changed
+        '''
+        self.probe = None
+        self.lags.append(max(0.0, monotonic() - self.expected))
+        redraw = getattr(self.board, 'redraw_time', None)
+        text = (f'Lag: {self.lags[-1] * 1000:.0f}ms (max {max(self.lags) * 1000:.0f}ms)\n'
+                f'Pending: {self.pending()}\n'
+                f'Redraw: {"-" if redraw is None else f"{redraw * 1000:.2f}ms"}')
+        if text != self.text:
+            self.text = text
+            self.label.config(text=text)
+        self.schedule()
+
+    def destroy(self):
+        '''
+        stop the probe before the DebugPanel is destroyed
+        '''
+        if self.probe is not None:
+            self.after_cancel(self.probe)
+            self.probe = None
+        super().destroy()
+
+
+class AnimationScheduler(object):
+    '''
+    A scheduler running the animation of all the animating tiles with one timer
+    the frame rate is capped, the starts and stops between two ticks are merged,
+    and the timer stops when no tile is animating
+
+    Attribution:
+        master: the component used to schedule the timer
+        draw: a function like draw(position, frame) to show a frame of a tile. frame is None when the animation
+              stops. it returns False if the tile could not be animated any more
+        interval: the time between two ticks in millisecond
+        period: how long a frame is showed in millisecond
+        frames: the number of frames of the animation
+        tiles: a dictionary from the position of an animating tile to its start time and showed frame
+        pending: the tiles waiting for starting (True) or stopping (False) at the next tick
+        job: the identifier of the scheduled tick
+    '''
+    def __init__(self, master, draw, fps=ANIMATION_FPS, period=WAVE_PERIOD, frames=2):
+        '''
+        to construct the AnimationScheduler class
+        :param master: the component used to schedule the timer
+        :param draw: a function to show a frame of a tile
+        :param fps: the most ticks in a second
+        :param period: how long a frame is showed in millisecond
+        :param frames: the number of frames of the animation
+        '''
+        self.master = master
+        self.draw = draw
+        self.interval = 1000 // fps
+        self.period = period
+        self.frames = frames
+        self.tiles = {}
+        self.pending = {}
+        self.job = None
+
+    def start(self, position):
+        '''
+        start the animation of a tile at the next tick
+        :param position: a tuple like (x, y)
+        '''
+        self.pending[position] = True
+        self.schedule()
+
+    def stop(self, position):
+        '''
+        stop the animation of a tile at the next tick
+        :param position: a tuple like (x, y)
+        '''
+        if position in self.tiles or position in self.pending:
+            self.pending[position] = False
+            self.schedule()
+
+    def clear(self):
+        '''
+        forget all the animating tiles without drawing them and stop the timer
+        '''
+        self.tiles.clear()
+        self.pending.clear()
+        if self.job is not None:
+            self.master.after_cancel(self.job)
+            self.job = None
+
+    def schedule(self):
+        '''
+        schedule the next tick if it is not scheduled
+        '''
+        if self.job is None:
+            self.job = self.master.after(self.interval, self.tick)
+
+    def tick(self):
+        '''
+        apply the pending starts and stops, and show the current frame of every animating tile
+        '''
+        self.job = None
+        now = monotonic()
+        pending, self.pending = self.pending, {}
+        for position, animating in pending.items():
+            if animating:
+                self.tiles.setdefault(position, [now, None])
+            elif self.tiles.pop(position, None) is not None:
+                self.draw(position, None)
+
+        for position, tile in list(self.tiles.items()):
+            frame = int((now - tile[0]) * 1000 // self.period) % self.frames
+            if frame != tile[1]:
+                if self.draw(position, frame):
+                    tile[1] = frame
+                else:
+                    del self.tiles[position]
+        if self.tiles:
+            self.schedule()
+
+
 class BoardView(tk.Canvas):
     '''
     A class to display the game board on the window
@@ -527,6 +432,7 @@ class BoardView(tk.Canvas):
     Attribution:
         game_board: store the currently running game
         board_width: the size of the game board
+        redraw_time: the seconds of the redraw of the last click, or None before the first click
     '''
     def __init__(self, master, game_board: BoardModel, board_width=600, *args, **kwargs):
         '''
@@ -541,6 +447,7 @@ class BoardView(tk.Canvas):
         super().__init__(master, width=board_width, *args, **kwargs)
         self.game_board = game_board
         self.board_width = board_width
+        self.redraw_time = None
         self.board = self.load_board()
         self.redraw()
 
@@ -565,6 +472,7 @@ class BoardView(tk.Canvas):
             for x, tile in enumerate(row):
                 placement = tk.Label(self.master, text='  ', bg='green')
                 placement.grid(column=x, row=y, ipadx=20, ipady=20, padx=0, pady=0)
+                self.detect_mouse(placement, (y, x))
                 self.bind_clicks(placement, (y, x))
                 board_row.append(placement)
             labels.append(board_row)
@@ -593,19 +501,32 @@ class BoardView(tk.Canvas):
         '''
         return True
 
-    def redraw(self):
+    def changed_tiles(self, changed=None):
+        '''
+        to find the tiles waiting for updating
+        :param changed: a list of positions changed by the game. if it is None, all the tiles would be updated
+        :return: a list of tuples like ((x, y), tile)
+        '''
+        if changed is None:
+            return [((y, x), tile) for y, row in enumerate(self.get_board()) for x, tile in enumerate(row)]
+        return [(position, self.game_board.get_item(position)) for position in changed]
+
+    def redraw(self, changed=None):
         '''
         update the display board in the window
+        :param changed: a list of positions changed by the game. if it is None, all the tiles would be updated
         '''
-        board = self.get_board()
-        for y, row in enumerate(board):
-            for x, tile in enumerate(row):
-                position = (y, x)
-                text, background = self._text_and_background(tile)
-                placement = self.board[y][x]
-                placement.config(text=text, bg=background, borderwidth=0.5, relief="solid")
-                self.detect_mouse(placement, position)
-                self.bind_clicks(placement, position)
+        for (y, x), tile in self.changed_tiles(changed):
+            text, background = self._text_and_background(tile)
+            placement = self.board[y][x]
+            placement.config(text=text, bg=background, borderwidth=0.5, relief="solid")
+
+    def reset_board(self, changed):
+        '''
+        update the display board after the game restarts
+        :param changed: a list of positions changed by the game
+        '''
+        self.redraw(changed)
 
     def bind_clicks(self, label, position):
         '''
@@ -655,17 +576,23 @@ class BoardView(tk.Canvas):
         when detect left click from mouse, it would update the game board
         :param position: a tuple like (x, y)
         '''
-        self.game_board.left_click(position)
-        if self.game_board.isWorking:
-            self.redraw()
+        self.timed_redraw(self.game_board.left_click(position))
 
     def _handle_right_click(self, position):
         '''
         when detect right click from mouse. it would update the game board
         :param position: a tuple like (x, y)
         '''
-        self.game_board.right_click(position)
-        self.redraw()
+        self.timed_redraw(self.game_board.right_click(position))
+
+    def timed_redraw(self, changed):
+        '''
+        redraw the changed tiles of a click and keep the time of the redraw
+        :param changed: a list of positions changed by the game
+        '''
+        start = perf_counter()
+        self.redraw(changed)
+        self.redraw_time = perf_counter() - start
 
     def _text_and_background(self, tile):
         '''
@@ -699,8 +626,7 @@ class ImageBoardView(BoardView):
     Attribution:
         game_board: the running internal game
         board: the distribution of the diplayed board
-        state: to determine if the tile interact with players
-        frequency: the frequency of wave of grass
+        animation: the scheduler running the wave of grass on the tiles under the mouse
     '''
     def __init__(self, master, game_board: BoardModel, *args, **kwargs):
         '''
@@ -710,27 +636,27 @@ class ImageBoardView(BoardView):
         :param args: other parameters
         :param kwargs: other parameters
         '''
+        self.animation = AnimationScheduler(master, self._draw_wave)
         super().__init__(master, game_board, *args, **kwargs)
-        self.game_board = game_board
-        self.board = self.load_board()
-        self.frequecy = 5
-        self.redraw()
-        self.state = [[True for i in range(self.game_board.grid_size)] for j in range(self.game_board.grid_size)]
 
-    def redraw(self):
+    def redraw(self, changed=None):
         '''
         to update the displayed board. to cover the tiles by image
+        :param changed: a list of positions changed by the game. if it is None, all the tiles would be updated
         '''
-        board = self.get_board()
-        for y, row in enumerate(board):
-            for x, tile in enumerate(row):
-                position = (y, x)
-                image = self._load_tile_image(tile)
-                placement = self.board[y][x]
-                placement.config(image=image)
-                placement.image = image
-                self.detect_mouse(placement, position)
-                self.bind_clicks(placement, position)
+        for (y, x), tile in self.changed_tiles(changed):
+            image = self._load_tile_image(tile)
+            placement = self.board[y][x]
+            placement.config(image=image)
+            placement.image = image
+
+    def reset_board(self, changed):
+        '''
+        update the display board after the game restarts. all the waves of grass would stop
+        :param changed: a list of positions changed by the game
+        '''
+        self.animation.clear()
+        self.redraw(changed)
 
     def detect_mouse(self, label, position):
         '''
@@ -741,82 +667,43 @@ class ImageBoardView(BoardView):
         label.bind("<Enter>", lambda e, position=position: self._handle_move(position))
         label.bind("<Leave>", lambda e, position=position: self._handle_leave(position))
 
-    def _handle_left_click(self, position):
+    def _draw_wave(self, position, frame):
         '''
-        to update the tiles while mouse left click a tile
+        show a frame of the wave of grass on a tile. it is called by the animation scheduler
         :param position: the position of the tile
-        '''
-        self.game_board.left_click(position)
-        self.state[position[0]][position[1]] = False
-        if self.game_board.isWorking:
-            self.redraw()
-
-    def _handle_right_click(self, position):
-        '''
-        to update the tiles while mouse right click a tile
-        :param position: the position of the tile
-        '''
-        self.game_board.right_click(position)
-        self.state[position[0]][position[1]] = False
-        self.master.after(self.frequecy, self.set_state, position, True)
-        self.redraw()
-
-    def _trigger_image(self, position, placement, count):
-        '''
-        trigger the image to complete the wave of grass
-        :param position: the position of the compoonent
-        :param placement: a component
-        :param count: determine which image would be showed
+        :param frame: 0 or 1 to choose the image, or None when the wave stops
+        :return: False if the tile is exposed or caught and could not wave any more
         '''
         x, y = position
-        tempTime = 200/self.frequecy
-        if count > tempTime and self.state[x][y]:
-            image = get_image(f"images/unrevealed")
-            placement.config(image=image)
-            placement.image = image
-            self.master.after(self.frequecy, self._trigger_image, position, placement, (count+1) % (2 * tempTime))
-        elif count <= tempTime and self.state[x][y]:
-            image = get_image(f"images/unrevealed_moved")
-            placement.config(image=image)
-            placement.image = image
-            self.master.after(self.frequecy, self._trigger_image, position, placement, (count+1) % (2 * tempTime))
+        if self.game_board.get_item(position) != '~':
+            return False
+        image = get_image("images/unrevealed" if frame != 0 else "images/unrevealed_moved")
+        placement = self.board[x][y]
+        placement.config(image=image)
+        placement.image = image
+        return True
 
     def _handle_move(self, position):
         '''
         to chase the mouse on the position of tile and update the interaction
         :param position: a tuple like (x, y)
         '''
-        x, y = position
-        if self.game_board.get_board()[x][y] == '~':
-            placement = self.board[x][y]
-            image = get_image(f"images/unrevealed_moved")
-            placement.config(image=image)
-            placement.image = image
-            self.master.after(self.frequecy, self._trigger_image, position, placement, 1)
-
-    def set_state(self, position, bool):
-        '''
-        to set the state of position
-        :param position: a tuple like (x, y)
-        :param bool: True or False
-        '''
-        x, y = position
-        self.state[x][y] = bool
+        if self.game_board.get_item(position) == '~':
+            self.animation.start(position)
 
     def _handle_leave(self, position):
         '''
         to chase the mouse leave the positon and update the tile
         :param position: a tuple like (x, y)
         '''
+        self.animation.stop(position)
 
-        x, y = position
-        self.state[x][y] = False
-        if self.game_board.get_board()[x][y] == '~':
-            placement = self.board[x][y]
-            image = get_image(f"images/unrevealed")
-            placement.config(image=image)
-            placement.image = image
-        self.master.after(self.frequecy*3, self.set_state, position, True)
+    def destroy(self):
+        '''
+        stop the animation before the board is destroyed
+        '''
+        self.animation.clear()
+        super().destroy()
 
     def load_board(self):
         '''
@@ -830,6 +717,7 @@ class ImageBoardView(BoardView):
             for x, tile in enumerate(row):
                 placement = tk.Label(self.master)
                 placement.grid(column=x, row=y)
+                self.detect_mouse(placement, (y, x))
                 self.bind_clicks(placement, (y, x))
                 board_row.append(placement)
             labels.append(board_row)
@@ -840,20 +728,360 @@ class ImageBoardView(BoardView):
         cover images on the corresponding tile based on the game board
         :return: the corrsponding images
         '''
-        try:
-            if tile == '~':
-                image = get_image(f"images/unrevealed")
-            elif tile == FLAG:
-                image = get_image(f"images/pokeball")
-            elif tile == POKEMON:
-                image = get_image(f"images/pokemon_sprites/{IMAGE_POKEMON[random.randint(0, len(IMAGE_POKEMON))-1]}")
+        return get_tile_image(tile)
+
+
+class CanvasBoardView(BoardView):
+    '''
+    a class to draw the whole display board on one canvas instead of a label for every tile
+    every tile is one canvas item, and one handler for each mouse event maps the pixel to the tile
+    it could show the tiles by color (MODE ONE) or by image (MODE TWO)
+
+    Attribution:
+        images: determine if the tiles are showed by image
+        tile_width: the width of a tile in pixel
+        tile_height: the height of a tile in pixel
+        board: a dictionary from the position of a tile to its canvas item
+        texts: the text items showing the number of tiles. it is only used by color tiles
+        hover: the position of the tile under the mouse
+        animation: the scheduler running the wave of grass on the tile under the mouse
+    '''
+    def __init__(self, master, game_board: BoardModel, images=False, *args, **kwargs):
+        '''
+        to construct the class CanvasBoardView
+        :param master: the super component
+        :param game_board: the running internal game
+        :param images: if it is True, the tiles would be showed by image
+        :param args: other parameters
+        :param kwargs: other parameters
+        '''
+        self.images = images
+        self.tile_width, self.tile_height = TILE_WIDTH, TILE_HEIGHT
+        self.texts = {}
+        self.hover = None
+        self.animation = AnimationScheduler(master, self._draw_wave)
+        kwargs.setdefault('height', game_board.grid_size * self.tile_height)
+        kwargs.setdefault('highlightthickness', 0)
+        board_width = kwargs.pop('width', game_board.grid_size * self.tile_width)
+        super().__init__(master, game_board, board_width, *args, **kwargs)
+        self.layout()
+        self.do_bind()
+
+    def layout(self):
+        '''
+        to put the canvas in the super component
+        '''
+        self.pack()
+
+    def load_board(self):
+        '''
+        create a canvas item for every tile of the game board
+        :return: a dictionary from the position of a tile to its canvas item
+        '''
+        items = {}
+        for y in range(self.game_board.grid_size):
+            for x in range(self.game_board.grid_size):
+                items[(y, x)] = self.create_tile((y, x))
+        return items
+
+    def create_tile(self, position):
+        '''
+        create the canvas item of a tile
+        :param position: a tuple like (x, y)
+        :return: the canvas item
+        '''
+        y, x = position
+        left, top = x * self.tile_width, y * self.tile_height
+        if self.images:
+            return self.create_image(left, top, anchor=tk.NW)
+        return self.create_rectangle(left, top, left + self.tile_width, top + self.tile_height, width=1)
+
+    def do_bind(self):
+        '''
+        to bind the operation of mouse on the whole canvas
+        '''
+        self.bind("<Button-1>", lambda e: self._handle_event(e, self._handle_left_click))
+        self.bind("<Button-2>", lambda e: self._handle_event(e, self._handle_right_click))
+        self.bind("<Button-3>", lambda e: self._handle_event(e, self._handle_right_click))
+        self.bind("<Motion>", self._handle_motion)
+        self.bind("<Leave>", self._handle_canvas_leave)
+
+    def position_at(self, event):
+        '''
+        map the pixel of the mouse to the tile
+        :param event: the mouse event
+        :return: the position of the tile, or None if the mouse is not on a tile
+        '''
+        x, y = int(self.canvasx(event.x) // self.tile_width), int(self.canvasy(event.y) // self.tile_height)
+        if self.game_board.is_on_board((y, x)):
+            return y, x
+        return None
+
+    def _handle_event(self, event, handler):
+        '''
+        to call the handler with the tile under the mouse
+        :param event: the mouse event
+        :param handler: a method taking the position of a tile
+        '''
+        position = self.position_at(event)
+        if position is not None:
+            handler(position)
+
+    def _handle_motion(self, event):
+        '''
+        when the mouse moves to another tile, the old tile loses the highlight and the new tile gets it
+        :param event: the mouse event
+        '''
+        position = self.position_at(event)
+        if position != self.hover:
+            self._handle_canvas_leave(event)
+            self.hover = position
+            if position is not None:
+                self._handle_move(position)
+
+    def _handle_canvas_leave(self, event):
+        '''
+        when the mouse leaves the tile or the canvas, the tile loses the highlight
+        :param event: the mouse event
+        '''
+        if self.hover is not None:
+            self._handle_leave(self.hover)
+            self.hover = None
+
+    def redraw(self, changed=None):
+        '''
+        update the canvas items of the tiles
+        :param changed: a list of positions changed by the game. if it is None, all the tiles would be updated
+        '''
+        for position, tile in self.changed_tiles(changed):
+            self.draw_tile(position, tile)
+
+    def draw_tile(self, position, tile):
+        '''
+        update the canvas item of a tile
+        :param position: a tuple like (x, y)
+        :param tile: a type of tile
+        '''
+        y, x = position
+        item = self.board[position]
+        if self.images:
+            self.itemconfig(item, image=get_tile_image(tile))
+            return
+        text, background = self._text_and_background(tile)
+        self.itemconfig(item, fill=background, width=1)
+        if text.strip():
+            if position in self.texts:
+                self.itemconfig(self.texts[position], text=text)
             else:
-                image = get_image(f"images/{IMAGE_MATCH[int(tile)]}")
+                self.texts[position] = self.create_text((x + 0.5) * self.tile_width, (y + 0.5) * self.tile_height,
+                                                        text=text)
+        elif position in self.texts:
+            self.delete(self.texts.pop(position))
 
-        except AttributeError:
-            print('something wrong')
-            image = get_image("images/unrevealed")
-        return image
+    def _handle_move(self, position):
+        '''
+        when mouse move on a tile, it would be highlighted
+        :param position: the position of the tile
+        '''
+        if position in self.board and self.game_board.get_item(position) == '~':
+            if self.images:
+                self.animation.start(position)
+            else:
+                self.itemconfig(self.board[position], width=3)
+
+    def _handle_leave(self, position):
+        '''
+        when the mouse leave the tile. it would lose the highlight
+        :param position: the position of the tile
+        '''
+        if self.images:
+            self.animation.stop(position)
+        elif position in self.board and self.game_board.get_item(position) == '~':
+            self.draw_tile(position, '~')
+
+    def _draw_wave(self, position, frame):
+        '''
+        show a frame of the wave of grass on a tile. it is called by the animation scheduler
+        :param position: the position of the tile
+        :param frame: 0 or 1 to choose the image, or None when the wave stops
+        :return: False if the tile is out of the canvas, exposed or caught and could not wave any more
+        '''
+        if position not in self.board or self.game_board.get_item(position) != '~':
+            return False
+        image = get_image("images/unrevealed" if frame != 0 else "images/unrevealed_moved")
+        self.itemconfig(self.board[position], image=image)
+        return True
+
+    def reset_board(self, changed):
+        '''
+        update the display board after the game restarts. all the waves of grass would stop
+        :param changed: a list of positions changed by the game
+        '''
+        self.animation.clear()
+        self.redraw(changed)
+
+    def destroy(self):
+        '''
+        stop the animation before the board is destroyed
+        '''
+        self.animation.clear()
+        super().destroy()
+
+
+class VirtualBoardView(CanvasBoardView):
+    '''
+    a class to show a board bigger than the window. the canvas scrolls over the whole board, but only the tiles
+    in the visible window and a margin around it have canvas items. the items are recycled while scrolling,
+    and the tiles out of the window are only kept in the internal game
+
+    Attribution:
+        window: the range of rows and columns that have canvas items
+        spare: the canvas items waiting for reuse
+        scrollbars: the horizontal and vertical scrollbars
+    '''
+    def __init__(self, master, game_board: BoardModel, images=False, *args, **kwargs):
+        '''
+        to construct the class VirtualBoardView
+        :param master: the super component
+        :param game_board: the running internal game
+        :param images: if it is True, the tiles would be showed by image
+        :param args: other parameters
+        :param kwargs: other parameters
+        '''
+        self.window = (range(0), range(0))
+        self.spare = []
+        self.scrollbars = []
+        kwargs.setdefault('width', min(game_board.grid_size * TILE_WIDTH, VIEWPORT_WIDTH))
+        kwargs.setdefault('height', min(game_board.grid_size * TILE_HEIGHT, VIEWPORT_HEIGHT))
+        super().__init__(master, game_board, images, *args, **kwargs)
+        width, height = game_board.grid_size * self.tile_width, game_board.grid_size * self.tile_height
+        self.config(scrollregion=(0, 0, width, height),
+                    xscrollincrement=self.tile_width, yscrollincrement=self.tile_height)
+
+    def layout(self):
+        '''
+        to put the canvas and its scrollbars in the super component
+        '''
+        horizontal = tk.Scrollbar(self.master, orient=tk.HORIZONTAL, command=self.xview)
+        vertical = tk.Scrollbar(self.master, orient=tk.VERTICAL, command=self.yview)
+        self.config(xscrollcommand=horizontal.set, yscrollcommand=vertical.set)
+        self.grid(row=0, column=0)
+        vertical.grid(row=0, column=1, sticky=tk.NS)
+        horizontal.grid(row=1, column=0, sticky=tk.EW)
+        self.scrollbars = [horizontal, vertical]
+
+    def do_bind(self):
+        '''
+        to bind the operation of mouse, including the wheel to scroll the board
+        '''
+        super().do_bind()
+        self.bind("<Configure>", lambda e: self.update_window())
+        self.bind("<MouseWheel>", lambda e: self.scroll(self.yview_scroll, -1 if e.delta > 0 else 1))
+        self.bind("<Shift-MouseWheel>", lambda e: self.scroll(self.xview_scroll, -1 if e.delta > 0 else 1))
+        self.bind("<Button-4>", lambda e: self.scroll(self.yview_scroll, -1))
+        self.bind("<Button-5>", lambda e: self.scroll(self.yview_scroll, 1))
+
+    def scroll(self, view_scroll, step):
+        '''
+        scroll the board by tiles and update the visible window
+        :param view_scroll: xview_scroll or yview_scroll
+        :param step: the number of tiles to scroll
+        '''
+        view_scroll(step, 'units')
+        self.update_window()
+
+    def xview(self, *args):
+        '''
+        scroll the board horizontally. it is called by the scrollbar
+        '''
+        result = super().xview(*args)
+        if args:
+            self.update_window()
+        return result
+
+    def yview(self, *args):
+        '''
+        scroll the board vertically. it is called by the scrollbar
+        '''
+        result = super().yview(*args)
+        if args:
+            self.update_window()
+        return result
+
+    def visible_window(self):
+        '''
+        :return: the range of rows and columns visible on the canvas, including the margin
+        '''
+        if self.winfo_ismapped():
+            width, height = self.winfo_width(), self.winfo_height()
+        else:
+            width, height = int(self.cget('width')), int(self.cget('height'))
+        left, top = self.canvasx(0), self.canvasy(0)
+        grid_size = self.game_board.grid_size
+        rows = range(max(int(top // self.tile_height) - VIEWPORT_MARGIN, 0),
+                     min(int((top + height) // self.tile_height) + 1 + VIEWPORT_MARGIN, grid_size))
+        columns = range(max(int(left // self.tile_width) - VIEWPORT_MARGIN, 0),
+                        min(int((left + width) // self.tile_width) + 1 + VIEWPORT_MARGIN, grid_size))
+        return rows, columns
+
+    def load_board(self):
+        '''
+        create canvas items only for the tiles in the visible window
+        :return: a dictionary from the position of a tile to its canvas item
+        '''
+        self.board = {}
+        self.update_window(redraw=False)
+        return self.board
+
+    def update_window(self, redraw=True):
+        '''
+        move the canvas items from the tiles that left the visible window to the tiles that entered it
+        :param redraw: determine if the entered tiles would be drawn
+        '''
+        rows, columns = self.visible_window()
+        if (rows, columns) == self.window:
+            return
+        self.window = rows, columns
+        for position in [position for position in self.board if position[0] not in rows or position[1] not in columns]:
+            self.spare.append(self.board.pop(position))
+            if position in self.texts:
+                self.delete(self.texts.pop(position))
+
+        entered = []
+        for y in rows:
+            for x in columns:
+                if (y, x) not in self.board:
+                    self.board[(y, x)] = self.reuse_tile((y, x)) if self.spare else self.create_tile((y, x))
+                    entered.append((y, x))
+        for item in self.spare:
+            self.itemconfig(item, state=tk.HIDDEN)
+        if redraw:
+            self.redraw(entered)
+
+    def reuse_tile(self, position):
+        '''
+        move a spare canvas item to the tile
+        :param position: a tuple like (x, y)
+        :return: the canvas item
+        '''
+        y, x = position
+        item = self.spare.pop()
+        left, top = x * self.tile_width, y * self.tile_height
+        if self.images:
+            self.coords(item, left, top)
+        else:
+            self.coords(item, left, top, left + self.tile_width, top + self.tile_height)
+        self.itemconfig(item, state=tk.NORMAL)
+        return item
+
+    def redraw(self, changed=None):
+        '''
+        update the canvas items of the tiles in the visible window
+        :param changed: a list of positions changed by the game. if it is None, all the visible tiles would be updated
+        '''
+        if changed is None:
+            changed = list(self.board)
+        super().redraw([position for position in changed if position in self.board])
 
 
 '''
@@ -876,14 +1104,23 @@ class PokemonGame:
         game: the running game
         boardView: the board build on the board_frame
         button_frame: a frame to put buttons
+        canvas: determine if the board is drawn on a single canvas
+        board_class: BoardModel, or NoGuessBoard to place pokemon at the first click without guesses
+        journal: the Journal saving every move when autosave is on, or None
+        recording: the Recording of the moves of a seeded game, or None
+        leaderboard: the Leaderboard of the high scores. it is opened when first needed
+        debug: determine if the DebugPanel is showed next to the status bar
+        debug_panel: the DebugPanel, or None
+        history: the History to undo and redo the clicks of the game
     '''
-    def __init__(self, master, grid_size=11, num_pokemon=20, task=TASK_TWO):
+    def __init__(self, master, grid_size=11, num_pokemon=20, task=TASK_TWO, debug=False):
         '''
         to construct the PokemonGmae class
         :param master: the super component
         :param grid_size: the size of the game board
         :param num_pokemon: the number of pokemon
         :param task: the mode of display
+        :param debug: if it is True, the DebugPanel would be showed
         '''
         self.master = master
         self.level = 1
@@ -892,10 +1129,17 @@ class PokemonGame:
         self.panel, self.board, self.game = None, None, None
         self.boardView = None
         self.button_frame = None
+        self.canvas = False
+        self.board_class = BoardModel
+        self.journal = None
+        self.recording = None
+        self.leaderboard = None
+        self.debug = debug
+        self.debug_panel = None
+        self.history = History()
         self.generate_menu()
         self.initial_game(grid_size, num_pokemon)
-        self.draw()
-        self.check_result()
+        self.draw(self._restore_autosave())
 
     def draw(self, time=0):
         '''
@@ -908,20 +1152,44 @@ class PokemonGame:
                                fg='white', width=100)
         title_label.pack(side=tk.TOP)
 
+        self.game.subscribe(EVENT_WON, self._game_over)
+        self.game.subscribe(EVENT_LOST, self._game_over)
+        if self.recording is None or self.recording.game is not self.game:
+            self._record()
+
         try:
             self.board_frame = tk.Frame(self.master)
-            if self.task == TASK_ONE:
+            # a board bigger than the viewport is scrolled, and a smaller one is drawn on a canvas when chosen
+            if self.game.grid_size * TILE_WIDTH > VIEWPORT_WIDTH or self.game.grid_size * TILE_HEIGHT > VIEWPORT_HEIGHT:
+                self.board = VirtualBoardView(self.board_frame, self.game, images=self.task == TASK_TWO)
+            elif self.canvas:
+                self.board = CanvasBoardView(self.board_frame, self.game, images=self.task == TASK_TWO)
+            elif self.task == TASK_ONE:
                 self.board = BoardView(self.board_frame, self.game)
             elif self.task == TASK_TWO:
                 self.board = ImageBoardView(self.board_frame, self.game)
             self.board_frame.pack(side=tk.TOP)
         except Exception as e:
             traceback.print_exc(e)
+        self.draw_panel(time)
+        if self.journal is not None:
+            self.journal.attach(self.game)
+        self.history.attach(self.game)
+
+    def draw_panel(self, time=0):
+        '''
+        to draw the status bar and buttons of game
+        :param time: the beginning time
+        '''
         try:
             self.panel_frame = tk.Frame(self.master)
             self.panel = StatusBar(self.panel_frame, self.game, time)
             self.panel_frame.pack(side=tk.TOP)
             self.panel.pack(side=tk.LEFT)
+            self.debug_panel = None
+            if self.debug:
+                self.debug_panel = DebugPanel(self.panel_frame, self.board)
+                self.debug_panel.pack(side=tk.LEFT)
         except Exception as e:
             traceback.print_exc(e)
 
@@ -942,19 +1210,25 @@ class PokemonGame:
         :param num_pokemon: the number of pokemon
         :return:
         '''
-        self.game = BoardModel(grid_size, num_pokemon)
+        self.game = self.board_class(grid_size, num_pokemon, seed=random.randrange(SEED_RANGE))
 
     def check_result(self):
         '''
         to check the game is win or loss
         '''
+        from tkinter import messagebox
         if self.game.check_win():
             self.game.set_state(False)
             self.panel.set_state(False)
-            messagebox.showinfo('Game Over', f'You Win! You spent {self.panel.get_time()//60}m {self.panel.get_time()%60}s')
+            messagebox.showinfo('Game Over',
+                                f'You Win! You spent {self.panel.get_time()//60}m {self.panel.get_time()%60}s')
             self.record_score()
             self.reading_ranking()
             self.new_game()
+        if self.game.loss and self.history.practice:
+            if messagebox.askyesno('Game Over', 'You Lost. Would you like to undo the last click?'):
+                self.undo()
+                return
         if self.game.check_lose():
             self.game.set_state(False)
             self.panel.set_state(False)
@@ -963,7 +1237,12 @@ class PokemonGame:
                 self.reset_game()
             else:
                 self._exit_game()
-        self.master.after(100, self.check_result)
+
+    def _game_over(self):
+        '''
+        check the result after the event of the game is handled, because the board may be redrawn
+        '''
+        self.master.after_idle(self.check_result)
 
     def generate_menu(self):
         '''
@@ -974,6 +1253,9 @@ class PokemonGame:
         file_menu = tk.Menu(self.menu_frame, tearoff=0)
         file_menu.add_command(label="Save Game", command=self._save_file)
         file_menu.add_command(label='Load Game', command=self._load_file)
+        file_menu.add_command(label='Save Replay', command=self._save_replay)
+        file_menu.add_command(label='Undo', accelerator='Ctrl+Z', command=self.undo)
+        file_menu.add_command(label='Redo', accelerator='Ctrl+Y', command=self.redo)
         file_menu.add_command(label="Restart Game", command=self.reset_game)
         file_menu.add_command(label="New Game", command=self.new_game)
         file_menu.add_separator()
@@ -984,6 +1266,11 @@ class PokemonGame:
         exit_menu = tk.Menu(self.menu_frame, tearoff=0)
         exit_menu.add_command(label='Mode ONE', command=self._task_one)
         exit_menu.add_command(label='Mode TWO', command=self._task_two)
+        exit_menu.add_command(label='Canvas Board', command=self._toggle_canvas)
+        exit_menu.add_command(label='No Guess Board', command=self._toggle_no_guess)
+        exit_menu.add_command(label='Autosave', command=self._toggle_autosave)
+        exit_menu.add_command(label='Debug Panel', command=self._toggle_debug)
+        exit_menu.add_command(label='Practice Mode', command=self._toggle_practice)
         exit_menu.add_command(label='Help', command=self._help)
         exit_menu.add_command(label='High Scores', command=self.reading_ranking)
         exit_menu.add_separator()
@@ -991,70 +1278,55 @@ class PokemonGame:
 
         self.menu_frame.add_cascade(label='Edit', menu=exit_menu)
         self.master.config(menu=self.menu_frame)
+        self.master.bind('<Control-z>', lambda e: self.undo())
+        self.master.bind('<Control-y>', lambda e: self.redo())
+
+    def get_leaderboard(self):
+        '''
+        :return: the Leaderboard of the high scores
+        '''
+        if self.leaderboard is None:
+            from pokemon_core.leaderboard import Leaderboard
+            self.leaderboard = Leaderboard(SCORES_PATH)
+        return self.leaderboard
 
     def reading_ranking(self):
         '''
-        to get the ranking list from static file and show on the front
-        '''
-        ranking_file = os.getcwd()+'\\record.txt'
-        if os.path.exists(ranking_file):
-            with open(ranking_file, 'r') as file:
-                content = json.load(file)
-            file.close()
-            message_text = ''
-            count = 1
-            for key, value in content.items():
-                value = int(value)
-                message_text = f'{message_text} No.{count} {key}: {value//60}m {value%60}s\n'
-                count += 1
-                if count == 4:
-                    break
-        else:
+        to get the ranking list of the current board from the database and show on the front
+        '''
+        from tkinter import messagebox
+        try:
+            scores = self.get_leaderboard().top(self.game.grid_size, self.game.num_pokemon, TOP_SCORES)
+        except Exception:
+            messagebox.showinfo('High Scores', 'Sorry, the high scores could not be read')
+            return
+        if not scores:
             messagebox.showinfo('High Scores', 'There have been no score in the game!')
+            return
+        message_text = ''
+        for count, (name, value) in enumerate(scores, 1):
+            message_text = f'{message_text} No.{count} {name}: {value//60}m {value%60}s\n'
         messagebox.showinfo('High Scores', message_text)
 
     def record_score(self):
         '''
-        to record the score of players into a static file
+        to record the score of players into the database, with the recording of the game to check it later
         '''
-        record_file = os.getcwd()+'\\record.txt'
-
-        content = {}
-        ranking = 1
+        from tkinter import messagebox, simpledialog
+        seconds = self.panel.get_time()
         try:
-            if os.path.exists(record_file):
-                with open(record_file, 'r') as file:
-                    content = json.load(file)
-                file.close()
-
-                score_list = list(content.values())
-                while self.panel.get_time() > score_list[ranking-1]:
-                    ranking += 1
-                    if ranking == len(score_list) + 1:
-                        break
-                score_name = simpledialog.askstring("Input",
-                                                    f"You won in {self.panel.get_time() // 60}m "
-                                                    f"{self.panel.get_time() % 60}s and No.{ranking}. Enter Your Name:",
+            leaderboard = self.get_leaderboard()
+            ranking = leaderboard.rank(self.game.grid_size, self.game.num_pokemon, seconds)
+            score_name = simpledialog.askstring("Input",
+                                                f"You won in {seconds // 60}m {seconds % 60}s and No.{ranking}. "
+                                                f"Enter Your Name:",
+                                                parent=self.master)
+            while score_name is None or score_name == '':
+                score_name = simpledialog.askstring("Input", f"Error. The Name is None. Input Your Name Again:",
                                                     parent=self.master)
-                while score_name is None or score_name == '' or score_name in content.keys():
-                    score_name = simpledialog.askstring("Input",
-                                                        f"Error. The Name is Repeated or None. Input Your Name Again:",
-                                                        parent=self.master)
-                content[score_name] = self.panel.get_time()
-                content = dict(sorted(content.items(), key=lambda item: item[1]))
-            else:
-                score_name = simpledialog.askstring("Input",
-                                                    f"You won in {self.panel.get_time() // 60}m "
-                                                    f"{self.panel.get_time() % 60}s and 1st. Enter Your Name:",
-                                                    parent=self.master)
-                content[score_name] = self.panel.get_time()
-
-            jsonOBJ = json.dumps(content)
-            with open(record_file, 'w') as file:
-                file.write(jsonOBJ)
-            file.close()
-
-        except:
+            replay = self.recording.pack() if self.recording is not None and not self.recording.undone else None
+            leaderboard.record(self.game.grid_size, self.game.num_pokemon, score_name, seconds, replay)
+        except Exception:
             messagebox.showinfo('Record Score', 'Record failed. It will go to new default game')
             self.new_game()
 
@@ -1072,6 +1344,85 @@ class PokemonGame:
         self.task = TASK_TWO
         self.redraw(self.panel.get_time())
 
+    def _toggle_canvas(self):
+        '''
+        to change between drawing the board on a canvas and by labels
+        '''
+        self.canvas = not self.canvas
+        self.redraw(self.panel.get_time())
+
+    def _toggle_no_guess(self):
+        '''
+        to change between random boards and boards without guesses. a new board of the same size is started
+        '''
+        self.board_class = BoardModel if self.board_class is NoGuessBoard else NoGuessBoard
+        self.initial_game(self.game.grid_size, self.game.num_pokemon)
+        self.redraw()
+
+    def _toggle_autosave(self):
+        '''
+        to turn autosave on or off. the saved game is removed when it is turned off
+        '''
+        from pokemon_core.journal import Journal
+        if self.journal is None:
+            self.journal = Journal(AUTOSAVE_PATH, lambda: self.panel.get_time())
+            self.journal.attach(self.game)
+        else:
+            self.journal.discard()
+            self.journal = None
+
+    def _toggle_debug(self):
+        '''
+        to show or hide the DebugPanel next to the status bar
+        '''
+        self.debug = not self.debug
+        self.redraw(self.panel.get_time())
+
+    def _toggle_practice(self):
+        '''
+        to turn practice mode on or off. a lost click could be undone in practice mode
+        '''
+        self.history.practice = not self.history.practice
+
+    def undo(self):
+        '''
+        to undo the last click. the timer goes on if a lost click was undone
+        '''
+        lost = self.game.loss
+        self.board.redraw(self.history.undo())
+        if lost and not self.game.loss:
+            # the timer stopped when the game was lost
+            time = self.panel.get_time()
+            self.panel_frame.destroy()
+            self.draw_panel(time)
+
+    def redo(self):
+        '''
+        to redo the last undone click
+        '''
+        self.board.redraw(self.history.redo())
+        if self.game.loss or not self.game.isWorking:
+            self._game_over()
+
+    def _restore_autosave(self):
+        '''
+        continue the game of autosave if the game was quit or crashed while autosave was on
+        :return: the beginning time
+        '''
+        from pokemon_core.journal import Journal, restore
+        try:
+            restored = restore(AUTOSAVE_PATH)
+        except (OSError, ValueError):
+            restored = None
+        if restored is None:
+            return 0
+        self.journal = Journal(AUTOSAVE_PATH, lambda: self.panel.get_time())
+        game, time = restored
+        if game.loss or not game.isWorking:
+            return 0
+        self.game = game
+        return time
+
     def _exit_game(self):
         '''
         to quit the game
@@ -1082,77 +1433,81 @@ class PokemonGame:
         '''
         show some information
         '''
+        from tkinter import messagebox
         messagebox.showinfo('Help', 'Pokemon Game Requires Finding All Pokemon')
 
     def _about(self):
         '''
         show some information
         '''
+        from tkinter import messagebox
         messagebox.showinfo('About', 'It was made by myself')
 
     def _save_file(self):
         '''
         the save the current game that could be restore in the future
         '''
+        from tkinter import messagebox, filedialog
+        from pokemon_core.savefile import save_game
         if self.game.check_win() or self.game.check_lose():
             messagebox.showinfo('Error', 'The Game Was End, You Cannot Save It!')
             return
-        file_text = {
-            'game': {
-                'grid_size': str(self.game.grid_size),
-                'pokemon_list': str(self.game.pokemon),
-                'hidden_pokemon': str(self.game.hidden_pokemon),
-                'board': str(self.game.get_board()),
-                'left_pokemon': str(self.game.get_left_pokemon()),
-            },
-            'panel': {
-                'time': str(self.panel.get_time()),
-            }
-        }
-        jsOBJ = json.dumps(file_text)
-
-        file_path = filedialog.asksaveasfilename(title=u'Save File', defaultextension='.txt',
+
+        file_path = filedialog.asksaveasfilename(title=u'Save File', defaultextension=SAVE_EXTENSION,
                                                  initialfile='untitled_game',
-                                                 filetypes=[('text file', '.txt'), ('all file', '.*')])
+                                                 filetypes=[('saved game', SAVE_EXTENSION), ('all file', '.*')])
 
-        if file_text is not None:
+        if file_path:
             try:
-                with open(file=file_path, mode='w', encoding='utf-8') as file:
-                    file.write(jsOBJ)
-                file.close()
+                save_game(file_path, self.game, self.panel.get_time())
                 messagebox.showinfo('Save Game', 'Done')
-            except:
-                pass
+            except OSError:
+                messagebox.showinfo('Save Game', 'Sorry, save Failed. The file could not be written')
+
+    def _record(self):
+        '''
+        start recording the moves of a new game. a game loaded from a file has no seed and is not recorded
+        '''
+        from pokemon_core.replay import record_game
+        if self.recording is not None:
+            self.recording.detach()
+        self.recording = record_game(self.game) if self.game.seed is not None else None
+
+    def _save_replay(self):
+        '''
+        save the moves of the current game that could be replayed by pokemon_core.replay
+        '''
+        from tkinter import messagebox, filedialog
+        from pokemon_core.replay import save_recording
+        if self.recording is None:
+            messagebox.showinfo('Save Replay', 'Sorry, a loaded game could not be replayed')
+            return
+        if self.recording.undone:
+            messagebox.showinfo('Save Replay', 'Sorry, a game with undone clicks could not be replayed')
+            return
+        file_path = filedialog.asksaveasfilename(title=u'Save Replay', defaultextension=REPLAY_EXTENSION,
+                                                 initialfile='untitled_replay',
+                                                 filetypes=[('replay', REPLAY_EXTENSION), ('all file', '.*')])
+        if file_path:
+            try:
+                save_recording(file_path, self.recording)
+                messagebox.showinfo('Save Replay', 'Done')
+            except OSError:
+                messagebox.showinfo('Save Replay', 'Sorry, save Failed. The file could not be written')
 
     def _load_file(self):
         '''
-        to restore the saved game based on the saved file
+        to restore the saved game based on the saved file. the old text files could be loaded too
         '''
+        from tkinter import messagebox, filedialog
+        from pokemon_core.savefile import load_game
         try:
             file_path = filedialog.askopenfilename(title=u'Load File',
-                                                   filetypes=[('text file', '.txt'), ('all file', '.*')])
-            with open(file_path, 'r') as load_file:
-                content = json.load(load_file)
-            game = content['game']
-            grid_size = game['grid_size']
-            pokemon_list = game['pokemon_list']
-            hidden_pokemon = game['hidden_pokemon']
-            board = game['board']
-            left_pokemon = game['left_pokemon']
-            time = content['panel']['time']
-
-            grid_size = int(grid_size)
-            pokemon_list = eval(pokemon_list)
-            hidden_pokemon = eval(hidden_pokemon)
-            board = eval(board)
-            left_pokemon = int(left_pokemon)
-            time = int(time)
-
-            self.game = BoardModel(grid_size, len(pokemon_list))
-            self.game.pokemon = pokemon_list
-            self.game.hidden_pokemon = hidden_pokemon
-            self.game.displayBoard = board
-            self.game.left_pokemon = left_pokemon
+                                                   filetypes=[('saved game', SAVE_EXTENSION),
+                                                              ('old saved game', '.txt'), ('all file', '.*')])
+            if not file_path:
+                return
+            self.game, time = load_game(file_path)
             self.redraw(time)
         except:
             messagebox.showinfo('Load Game', 'Sorry, load Failed. There are some unknown errors')
@@ -1160,22 +1515,25 @@ class PokemonGame:
     def reset_game(self):
         '''
         restart the game without changing the board and pokemon list
+        only the changed tiles and the status bar would be redrawn
         '''
-        self.game.reset_game()
-        self.redraw()
+        self.board.reset_board(self.game.reset_game())
+        self.panel_frame.destroy()
+        self.draw_panel()
 
     def new_game(self):
         '''
         generate a new game. change the board and pokemon list
         '''
+        from tkinter import messagebox, simpledialog
         self.level = simpledialog.askstring("Input", "What level would you like to play (range from 1 to 10)",
                                             parent=self.master)
-        if self.level in [str(i) for i in list(range(1, 11))]:
+        if self.level in [str(i) for i in LEVELS]:
             self.level = int(self.level)
         else:
             messagebox.showinfo("New Game", "Sorry, it will go to the default level 9 because of wrong input!")
             self.level = 9
-        self.game = BoardModel(1+self.level, 2*self.level)
+        self.game = level_board(self.level, self.board_class, random.randrange(SEED_RANGE))
         self.game.reset_game()
         self.redraw()
 
@@ -1191,30 +1549,195 @@ class PokemonGame:
         self.draw(time)
 
 
+class ImageCache(object):
+    '''
+    A cache shared by the whole game so that every image is only read from disk and decoded once
+
+    Attribution:
+        images: a dictionary from the image name to the loaded tk.PhotoImage
+        formats: a dictionary from the image name to the file format that worked
+        hits: the number of times an image was found in the cache
+        misses: the number of times an image had to be loaded from disk
+    '''
+    def __init__(self):
+        '''
+        to construct an empty ImageCache
+        '''
+        self.images = {}
+        self.formats = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, image_name):
+        '''
+        :param image_name: the path of the image without format, like "images/clock"
+        :return: the tk.PhotoImage of the image
+        '''
+        image = self.images.get(image_name)
+        if image is not None:
+            self.hits += 1
+            return image
+        self.misses += 1
+        image = self.load(image_name)
+        self.images[image_name] = image
+        return image
+
+    def load(self, image_name):
+        '''
+        read the image from disk. If a .png doesn't work, default to the .gif image
+        the format that worked is remembered, so the next load would not try the other one
+
+        :param image_name: the path of the image without format
+        :return: the tk.PhotoImage of the image
+        '''
+        image_format = self.formats.get(image_name)
+        if image_format is not None:
+            return tk.PhotoImage(file=image_name + image_format)
+        for image_format in IMAGE_FORMATS[:-1]:
+            try:
+                image = tk.PhotoImage(file=image_name + image_format)
+                break
+            except tk.TclError:
+                pass
+        else:
+            image_format = IMAGE_FORMATS[-1]
+            image = tk.PhotoImage(file=image_name + image_format)
+        self.formats[image_name] = image_format
+        return image
+
+    def preload(self, directories=IMAGE_DIRECTORIES):
+        '''
+        load all the images in the directories into the cache before the game starts
+        :param directories: a list of directories holding images
+        '''
+        for directory in directories:
+            for file_name in sorted(os.listdir(directory)):
+                name, image_format = os.path.splitext(file_name)
+                image_name = f'{directory}/{name}'
+                if image_format in IMAGE_FORMATS and image_name not in self.images:
+                    self.images[image_name] = self.load(image_name)
+
+    def clear(self):
+        '''
+        forget all the loaded images and counters
+        '''
+        self.images.clear()
+        self.formats.clear()
+        self.hits = self.misses = 0
+
+
+IMAGE_CACHE = ImageCache()
+
+
 def get_image(image_name):
     """(tk.PhotoImage) Get a image file based on capability.
 
     If a .png doesn't work, default to the .gif image.
+    The image is shared through IMAGE_CACHE, so it is only loaded once.
     """
+    return IMAGE_CACHE.get(image_name)
+
+
+def get_tile_image(tile):
+    '''
+    cover images on the corresponding tile based on the game board
+    :param tile: a type of tile
+    :return: the corrsponding images
+    '''
     try:
-        image = tk.PhotoImage(file=image_name + ".png")
-    except tk.TclError:
-        image = tk.PhotoImage(file=image_name + ".gif")
+        if tile == '~':
+            image = get_image(f"images/unrevealed")
+        elif tile == FLAG:
+            image = get_image(f"images/pokeball")
+        elif tile == POKEMON:
+            image = get_image(f"images/pokemon_sprites/{IMAGE_POKEMON[random.randint(0, len(IMAGE_POKEMON))-1]}")
+        else:
+            image = get_image(f"images/{IMAGE_MATCH[int(tile)]}")
+
+    except AttributeError:
+        print('something wrong')
+        image = get_image("images/unrevealed")
     return image
 
 
-def main():
+# the Tk methods counted by the instrumentation
+TK_CALLS = ((tk.Misc, ('configure', 'config', 'after', 'after_cancel')),
+            (tk.Canvas, ('itemconfigure', 'itemconfig', 'coords', 'create_image', 'create_rectangle', 'create_text',
+                         'delete')),
+            (tk.Grid, ('grid', 'grid_configure')),
+            (tk.Pack, ('pack', 'pack_configure')))
+
+
+def instrument_game(instrument):
+    '''
+    time the clicks on the board and the restart as actions. every action ends after the layout of Tk,
+    and is broken down into the stages of the model, the views, the images and Tk
+    :param instrument: the Instrument
+    '''
+    def layout(widget, *args):
+        instrument.stage('tk', widget.update_idletasks)
+
+    instrument.time_action(BoardView, '_handle_left_click', 'click', layout)
+    instrument.time_action(BoardView, '_handle_right_click', 'flag', layout)
+    instrument.time_action(PokemonGame, 'reset_game', 'restart', lambda game: layout(game.master))
+    for board in (BoardModel, NoGuessBoard):
+        for method in ('left_click', 'right_click', 'extend_zero', 'reset_game'):
+            instrument.time_stage(board, method)
+    for view in (BoardView, ImageBoardView, CanvasBoardView, VirtualBoardView):
+        instrument.time_stage(view, 'redraw')
+    instrument.time_stage(StatusBar, 'refresh', 'status_bar')
+    instrument.time_stage(ImageCache, 'get', 'get_image')
+    for owner, methods in TK_CALLS:
+        for method in methods:
+            instrument.count_calls(owner, method)
+
+
+def main(first_frame=None, instrument=None, path=None, debug=None):
     '''
     To run the whole game
+
+    :param first_frame: a function called with the root window after the first frame is drawn
+    :param instrument: an Instrument timing the actions, or None. it is read from the environment by default
+    :param path: the file the Instrument is dumped to when the window is closed
+    :param debug: if it is True, the DebugPanel would be showed. it is read from the environment by default
     '''
+    from pokemon_core.instrument import DEFAULT_PATH, from_environment
+    if debug is None:
+        debug = os.environ.get(DEBUG_ENVIRONMENT) == '1'
+    if instrument is None:
+        instrument, path = from_environment()
+    if instrument is not None:
+        instrument_game(instrument)
+
     root = tk.Tk()
     root.title('Pokemon: Got 2 Find Them All!')
+    IMAGE_CACHE.preload()
 
-    PokemonGame(root)
+    PokemonGame(root, debug=debug)
 
     root.update()
+    if first_frame is not None:
+        first_frame(root)
     root.mainloop()
 
+    if instrument is not None:
+        instrument.dump(path or DEFAULT_PATH)
+        print(f'the timings were written to {path or DEFAULT_PATH}')
+
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    from pokemon_core.instrument import ACTIONS, DEFAULT_PATH, Instrument
+    parser = argparse.ArgumentParser(description='Play the pokemon game.')
+    parser.add_argument('--instrument', nargs='?', const=DEFAULT_PATH, default=None,
+                        help='time every action and write the timings to this file when the window is closed')
+    parser.add_argument('--profile', default=None, choices=ACTIONS,
+                        help='capture this action by cProfile. it needs --instrument')
+    parser.add_argument('--debug', action='store_true', default=None,
+                        help='show the lag of the event loop and the redraw time next to the status bar')
+    args = parser.parse_args()
+    if args.profile is not None and args.instrument is None:
+        parser.error('--profile needs --instrument')
+    if args.instrument is not None:
+        main(instrument=Instrument(profile=args.profile), path=args.instrument, debug=args.debug)
+    else:
+        main(debug=args.debug)
\ No newline at end of file
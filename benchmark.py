@@ -0,0 +1,315 @@
+'''
+    Benchmarks for the internal process of the pokemon game. the results could be written to a json file
+    and compared with the file of another commit
+
+    usage: python benchmark.py --output results.json --compare base.json
+'''
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from pokemon_core import LEVELS, BoardModel, Solver, generate_no_guess, level_board, level_size
+from pokemon_core.savefile import pack_game, unpack_game
+
+# the sizes of board and the rates of pokemon of the hot paths of BoardModel
+GRID_SIZES = (10, 100, 500, 1000, 2000)
+DENSITIES = (0.01, 0.1, 0.2)
+# the most operations timed together when one operation is too fast to time
+OPERATIONS = 1000
+# the directory of the game, where the new interpreters import it from
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# the code run in a new interpreter to time the import of the headless engine
+ENGINE_IMPORT = '''
+import sys, time
+start = time.perf_counter()
+import pokemon_core
+print(time.perf_counter() - start, 'tkinter' in sys.modules)
+'''
+
+# the code run in a new interpreter to time the game window until its first frame is drawn
+FIRST_FRAME = '''
+import time
+start = time.perf_counter()
+import Pokemon
+Pokemon.main(lambda root: (print(time.perf_counter() - start), root.after_idle(root.destroy)))
+'''
+
+
+def find_zero(game: BoardModel):
+    '''
+    find a tile which has no pokemon surrounding it
+
+    :param game: a BoardModel class
+    :return: the position of the tile, or None if there is no such tile
+    '''
+    for index, count in enumerate(game.counts):
+        if count == 0 and index not in game.pokemon_set:
+            return game.index_to_position(index)
+    return None
+
+
+def bench_extend_zero(grid_size=1000, num_pokemon=1000, repeat=3):
+    '''
+    time a left click which exposes a large zero area on a big board with sparse pokemon
+
+    :param grid_size: the size of the board
+    :param num_pokemon: the number of pokemon on the board
+    :param repeat: how many times the click is repeated on a reset board
+    :return: a tuple of the best time in second and the number of exposed tiles
+    '''
+    game = BoardModel(grid_size, num_pokemon)
+    position = find_zero(game)
+    assert position is not None
+
+    best, opened = None, 0
+    for _ in range(repeat):
+        game.reset_game()
+        start = time.perf_counter()
+        opened = len(game.extend_zero(position))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, opened
+
+
+def bench_solver(games=1000):
+    '''
+    solve games at every level of new game
+
+    :param games: the number of games solved at every level
+    :return: a dictionary from the level to a tuple of the boards solved per second and the rate of win
+    '''
+    result = {}
+    for level in LEVELS:
+        won = 0
+        start = time.perf_counter()
+        for _ in range(games):
+            won += Solver(level_board(level)).solve()
+        elapsed = time.perf_counter() - start
+        result[level] = (games / elapsed, won / games)
+    return result
+
+
+def bench_no_guess(games=200, big=(100, 1600)):
+    '''
+    time the generation of boards without guesses at every level of new game and on a big board
+
+    :param games: the number of boards generated at every level
+    :param big: a tuple of the size of the big board and its number of pokemon
+    :return: a dictionary from the level, or the big board, to a tuple of the mean and the worst time in second
+    '''
+    result = {}
+    sizes = [(level, *level_size(level)) for level in LEVELS] + [(big, big[0], big[1])]
+    for key, grid_size, num_pokemon in sizes:
+        times = []
+        for _ in range(games if key != big else 3):
+            first = random.randrange(grid_size ** 2)
+            start = time.perf_counter()
+            generate_no_guess(grid_size, num_pokemon, first)
+            times.append(time.perf_counter() - start)
+        result[key] = (sum(times) / len(times), max(times))
+    return result
+
+
+def best_of(function, repeat=3, setup=None):
+    '''
+    :param function: the function timed
+    :param repeat: the number of runs
+    :param setup: a function run before every run without timing
+    :return: the best time of the runs in second
+    '''
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_hot_paths(grid_size, density, repeat=3):
+    '''
+    time the hot paths of BoardModel on a board. an operation faster than a click is timed in a batch
+    and divided by the size of the batch
+
+    :param grid_size: the size of the board
+    :param density: the rate of pokemon on the board
+    :param repeat: the number of runs of every operation
+    :return: a list of result rows. a row is a dictionary of the name, the board and the seconds of one operation
+    '''
+    num_pokemon = max(1, int(grid_size ** 2 * density))
+    rows = []
+
+    def add(name, seconds, **extra):
+        rows.append(dict(name=name, grid_size=grid_size, num_pokemon=num_pokemon, density=density,
+                         seconds=seconds, **extra))
+
+    add('construct', best_of(lambda: BoardModel(grid_size, num_pokemon), repeat))
+    # the same board is timed on every commit, so the cascades could be compared
+    game = BoardModel(grid_size, num_pokemon, seed=grid_size)
+    add('generate_pokemon', best_of(lambda: game.generate_pokemon(grid_size, num_pokemon), repeat))
+
+    safe = [index for index in range(grid_size ** 2) if index not in game.pokemon_set]
+    positions = [game.index_to_position(index)
+                 for index in random.Random(grid_size).sample(safe, min(OPERATIONS, len(safe)))]
+    add('calculate_count', best_of(lambda: [game.calculate_count(position) for position in positions],
+                                   repeat) / len(positions))
+
+    def toggle():
+        for position in positions:
+            game.right_click(position)
+        for position in positions:
+            game.right_click(position)
+    add('right_click', best_of(toggle, repeat, game.reset_game) / (2 * len(positions)))
+    add('check_win', best_of(lambda: [game.check_win() for _ in range(OPERATIONS)], repeat) / OPERATIONS)
+
+    zero = find_zero(game)
+    if zero is not None:
+        game.reset_game()
+        opened = len(game.left_click(zero))
+        add('left_click_cascade', best_of(lambda: game.left_click(zero), repeat, game.reset_game), tiles=opened)
+        add('reset_game', best_of(game.reset_game, repeat, lambda: game.left_click(zero)), tiles=opened)
+
+    data = pack_game(game)
+    add('save', best_of(lambda: pack_game(game), repeat), bytes=len(data))
+    add('load', best_of(lambda: unpack_game(data), repeat), bytes=len(data))
+    return rows
+
+
+def run_python(code, required=True):
+    '''
+    run the code in a new interpreter in the directory of the game
+
+    :param code: the python code
+    :param required: if it is True, a failure raises RuntimeError with the error of the interpreter
+    :return: a tuple of the whole running time in second and the printed words, or None if it failed
+    '''
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=ROOT)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        if required:
+            raise RuntimeError(f'the benchmark failed in a new interpreter:\n{result.stderr.strip()}')
+        return None
+    return elapsed, result.stdout.split()
+
+
+def bench_startup():
+    '''
+    time the import of the headless engine and the first frame of the game window in new interpreters
+
+    :return: a dictionary of the measured times in second. the first frame is None without a display
+    '''
+    engine = run_python(ENGINE_IMPORT)
+    # the window could not be opened without a display
+    frame = run_python(FIRST_FRAME, required=False)
+    return {
+        'engine_import': float(engine[1][0]),
+        'engine_imports_tkinter': engine[1][1] == 'True',
+        'engine_process': engine[0],
+        'first_frame': float(frame[1][0]) if frame is not None else None,
+        'first_frame_process': frame[0] if frame is not None else None,
+    }
+
+
+def current_commit():
+    '''
+    :return: the git commit of the benchmarked code, or None if it is not in a git repository
+    '''
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, cwd=ROOT)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def row_key(row):
+    '''
+    :param row: a result row
+    :return: a tuple identifying the same benchmark in the results of another commit
+    '''
+    return row['name'], row.get('grid_size'), row.get('num_pokemon')
+
+
+def compare(rows, base_rows):
+    '''
+    print the time of every benchmark against the results of another commit
+
+    :param rows: the result rows
+    :param base_rows: the result rows of the other commit
+    '''
+    base = {row_key(row): row for row in base_rows}
+    for row in rows:
+        old = base.get(row_key(row))
+        if old is None or not old['seconds'] or row['seconds'] is None:
+            continue
+        print(f"{row['name']:>20} {row.get('grid_size') or '':>5} {row.get('num_pokemon') or '':>7}: "
+              f"{old['seconds'] * 1000:12.4f}ms -> {row['seconds'] * 1000:12.4f}ms "
+              f"({row['seconds'] / old['seconds']:.2f}x)")
+
+
+def main():
+    '''
+    To run all the benchmarks
+    '''
+    parser = argparse.ArgumentParser(description='Run the benchmarks of the pokemon game.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(GRID_SIZES),
+                        help='the sizes of board of the hot paths')
+    parser.add_argument('--densities', type=float, nargs='+', default=list(DENSITIES),
+                        help='the rates of pokemon of the hot paths')
+    parser.add_argument('--repeat', type=int, default=3, help='the number of runs of every operation')
+    parser.add_argument('--output', default=None, help='write the results to this json file')
+    parser.add_argument('--compare', default=None, help='compare with the json file of another commit')
+    args = parser.parse_args()
+    rows = []
+
+    startup = bench_startup()
+    print(f"engine import: {startup['engine_import'] * 1000:.1f}ms "
+          f"(tkinter imported: {startup['engine_imports_tkinter']})")
+    rows.append(dict(name='engine_import', seconds=startup['engine_import']))
+    if startup['first_frame'] is None:
+        print('first frame: no display')
+    else:
+        print(f"first frame: {startup['first_frame'] * 1000:.1f}ms")
+        rows.append(dict(name='first_frame', seconds=startup['first_frame']))
+
+    best, opened = bench_extend_zero()
+    print(f'extend_zero 1000x1000: {opened} tiles in {best:.3f}s')
+    rows.append(dict(name='extend_zero', grid_size=1000, num_pokemon=1000, seconds=best, tiles=opened))
+
+    for level, (rate, won) in bench_solver().items():
+        print(f'solver level {level}: {rate:.0f} boards/s, {won:.1%} won')
+        grid_size, num_pokemon = level_size(level)
+        rows.append(dict(name='solver', grid_size=grid_size, num_pokemon=num_pokemon, seconds=1 / rate, won=won))
+
+    for key, (mean, worst) in bench_no_guess().items():
+        name = f'level {key}' if key in LEVELS else f'{key[0]}x{key[0]} with {key[1]} pokemon'
+        print(f'no guess board {name}: {mean * 1000:.2f}ms on average, {worst * 1000:.2f}ms at worst')
+        grid_size, num_pokemon = (1 + key, 2 * key) if key in LEVELS else key
+        rows.append(dict(name='no_guess', grid_size=grid_size, num_pokemon=num_pokemon, seconds=mean, worst=worst))
+
+    for grid_size in args.sizes:
+        for density in args.densities:
+            for row in bench_hot_paths(grid_size, density, args.repeat):
+                extra = f" ({row['tiles']} tiles)" if 'tiles' in row else ''
+                print(f"{row['name']} {grid_size}x{grid_size} with {row['num_pokemon']} pokemon: "
+                      f"{row['seconds'] * 1000:.4f}ms{extra}")
+                rows.append(row)
+
+    if args.output is not None:
+        report = {'commit': current_commit(), 'python': sys.version.split()[0], 'time': time.time(), 'results': rows}
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if args.compare is not None:
+        with open(args.compare, 'r') as file:
+            compare(rows, json.load(file)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+'''
+    The headless core of Pokemon Game. It could be imported without tkinter or a display
+'''
+from .engine import (ALPHA, UP, DOWN, LEFT, RIGHT, DIRECTIONS, WALL_VERTICAL, WALL_HORIZONTAL, POKEMON, FLAG,
+                     UNEXPOSED, EXPOSED, INVALID, HELP_TEXT, EVENT_POKEMON, EVENT_WON, EVENT_LOST, EVENT_MOVE,
+                     ACTION_LEFT, ACTION_RIGHT, ACTION_RESET, ACTION_UNDO, ACTION_REDO, LEVELS, CELL_UNEXPOSED,
+                     CELL_FLAG, CELL_POKEMON, CELL_SYMBOLS, SYMBOL_CELLS, BoardRow, BoardGrid, BoardModel,
+                     level_size, level_board)
+from .solver import Solver, solve
+from .noguess import NoGuessBoard, generate_no_guess
+from .history import History
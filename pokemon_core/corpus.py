@@ -0,0 +1,204 @@
+'''
+    A generator of many boards written to a binary file of fixed records, and a reader which maps the file
+    into memory and makes a BoardModel of any record without parsing it
+
+    the file begins with a header of the magic, the version, the size of the boards, the number of pokemon
+    and the number of records. every record is the sorted indexes of pokemon as little-endian unsigned 32-bit
+    numbers, followed by a byte of count for every tile, padded to a multiple of 4 bytes
+
+    usage: python -m pokemon_core.corpus --boards 1000000 --level 10 --output boards.bin
+'''
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+
+from .engine import LEVELS, BoardModel, count_neighbours, level_size
+
+MAGIC = b'PKCORPUS'
+VERSION = 1
+# magic, version, grid_size, num_pokemon, records
+HEADER = struct.Struct('<8sHHIQ')
+# the records begin and end on a multiple of it, so the indexes of pokemon could be read as 32-bit numbers
+RECORD_ALIGN = 4
+
+
+def record_size(grid_size, num_pokemon):
+    '''
+    :param grid_size: the size of the boards
+    :param num_pokemon: the number of pokemon on every board
+    :return: the number of bytes of a record
+    '''
+    size = 4 * num_pokemon + grid_size ** 2
+    return -(-size // RECORD_ALIGN) * RECORD_ALIGN
+
+
+def generate_batch(grid_size, num_pokemon, boards, rng=random):
+    '''
+    generate the records of many boards at once. the counts of all the boards are counted together
+    by count_neighbours
+
+    :param grid_size: the size of the boards
+    :param num_pokemon: the number of pokemon on every board
+    :param boards: the number of boards
+    :param rng: a random.Random to place pokemon. the global random module is used by default
+    :return: a bytearray of the records
+    '''
+    assert num_pokemon <= grid_size ** 2
+    size = grid_size ** 2
+    tiles = range(size)
+    layouts = [sorted(rng.sample(tiles, num_pokemon)) for _ in range(boards)]
+    flags = bytearray(size * boards)
+    for board, pokemon in enumerate(layouts):
+        base = board * size
+        for index in pokemon:
+            flags[base + index] = 1
+    counts = count_neighbours(flags, grid_size)
+
+    pack = struct.Struct(f'<{num_pokemon}I').pack
+    padding = bytes(record_size(grid_size, num_pokemon) - 4 * num_pokemon - size)
+    records = bytearray()
+    for board, pokemon in enumerate(layouts):
+        records += pack(*pokemon)
+        records += counts[board * size:(board + 1) * size]
+        records += padding
+    return records
+
+
+def write_corpus(path, grid_size, num_pokemon, boards, batch_size=1000, seed=None):
+    '''
+    generate boards and write them to a corpus file. it is written to a temporary file first,
+    so a stopped run never leaves half a file
+
+    :param path: the path of the corpus file
+    :param grid_size: the size of the boards
+    :param num_pokemon: the number of pokemon on every board
+    :param boards: the number of boards
+    :param batch_size: the number of boards generated at a time
+    :param seed: the seed of the boards. the same seed always writes the same file
+    '''
+    rng = random.Random(seed)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, grid_size, num_pokemon, boards))
+        for start in range(0, boards, batch_size):
+            file.write(generate_batch(grid_size, num_pokemon, min(batch_size, boards - start), rng))
+    os.replace(temporary, path)
+
+
+class Corpus(object):
+    '''
+    To read the boards of a corpus file. the file is mapped into memory, and the counts of a board made
+    by board() are a view over the map, so all boards should be dropped before closing the corpus
+
+    Attribution:
+        file: the opened corpus file
+        map: the memory map of the file
+        view: a memoryview over the map
+        grid_size: the size of the boards
+        num_pokemon: the number of pokemon on every board
+        records: the number of boards
+        size: the number of bytes of a record
+    '''
+
+    def __init__(self, path):
+        '''
+        To open a corpus file
+
+        :param path: the path of the corpus file
+        '''
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.grid_size, self.num_pokemon, self.records = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a corpus file of version {VERSION}')
+        self.size = record_size(self.grid_size, self.num_pokemon)
+        if len(self.map) < HEADER.size + self.size * self.records:
+            self.close()
+            raise ValueError(f'{path} is cut short')
+        self.view = memoryview(self.map)
+
+    def __len__(self):
+        return self.records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def offset(self, n):
+        '''
+        :param n: the number of a record
+        :return: the offset of the record in the file
+        '''
+        if not 0 <= n < self.records:
+            raise IndexError(f'record {n} is out of the corpus')
+        return HEADER.size + n * self.size
+
+    def pokemon(self, n):
+        '''
+        :param n: the number of a record
+        :return: the indexes of the pokemon of the record. it is a view over the map on little-endian machines
+        '''
+        start = self.offset(n)
+        if sys.byteorder == 'little':
+            return self.view[start:start + 4 * self.num_pokemon].cast('I')
+        return struct.unpack_from(f'<{self.num_pokemon}I', self.map, start)
+
+    def counts(self, n):
+        '''
+        :param n: the number of a record
+        :return: a view over the counts of the record
+        '''
+        start = self.offset(n) + 4 * self.num_pokemon
+        return self.view[start:start + self.grid_size ** 2]
+
+    def board(self, n):
+        '''
+        :param n: the number of a record
+        :return: a new BoardModel of the record
+        '''
+        return BoardModel(self.grid_size, self.num_pokemon, self.pokemon(n), self.counts(n))
+
+    def close(self):
+        '''
+        unmap and close the file
+        '''
+        if getattr(self, 'view', None) is not None:
+            self.view.release()
+            self.view = None
+        self.map.close()
+        self.file.close()
+
+
+def main():
+    '''
+    To write a corpus from the command line
+    '''
+    parser = argparse.ArgumentParser(description='Generate many boards and write them to a corpus file.')
+    parser.add_argument('--boards', type=int, default=100000, help='the number of boards')
+    parser.add_argument('--level', type=int, choices=list(LEVELS), default=None,
+                        help='the level of the boards, instead of --grid-size and --pokemon')
+    parser.add_argument('--grid-size', type=int, default=10)
+    parser.add_argument('--pokemon', type=int, default=20, help='the number of pokemon on every board')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--output', default='boards.bin', help='the corpus file')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    if args.level is not None:
+        args.grid_size, args.pokemon = level_size(args.level)
+
+    start = time.perf_counter()
+    write_corpus(args.output, args.grid_size, args.pokemon, args.boards, args.batch_size, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f'{args.boards} boards of {args.grid_size}x{args.grid_size} with {args.pokemon} pokemon '
+          f'in {elapsed:.1f}s ({args.boards / elapsed:.0f} boards/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,669 @@
+'''
+    The part would complete the internal process of Pokemon Game.
+    It does not import anything from tkinter, so it could run without a display
+'''
+import random
+
+ALPHA = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+UP = "up"
+DOWN = "down"
+LEFT = "left"
+RIGHT = "right"
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT,
+              f"{UP}-{LEFT}", f"{UP}-{RIGHT}",
+              f"{DOWN}-{LEFT}", f"{DOWN}-{RIGHT}")
+WALL_VERTICAL = "|"
+WALL_HORIZONTAL = "-"
+POKEMON = "☺"
+FLAG = "♥"
+UNEXPOSED = "~"
+EXPOSED = "0"
+INVALID = "That ain't a valid action buddy."
+HELP_TEXT = """h - Help.
+<Uppercase Letter><number> - Selecting a cell (e.g. 'A1')
+f <Uppercase Letter><number> - Placing flag at cell (e.g. 'f A1')
+:) - Restart game.
+q - Quit.
+"""
+
+# the events published by BoardModel
+EVENT_POKEMON = 'pokemon'
+EVENT_WON = 'won'
+EVENT_LOST = 'lost'
+# published with the action, the position and the positions changed after a click changed the board,
+# after the game restarted, or after a click was undone or redone
+EVENT_MOVE = 'move'
+
+# the actions of a move. the position of ACTION_RESET is None, and the position of ACTION_UNDO and ACTION_REDO
+# is the position of the click undone or redone
+ACTION_LEFT = 'left_click'
+ACTION_RIGHT = 'right_click'
+ACTION_RESET = 'reset_game'
+ACTION_UNDO = 'undo'
+ACTION_REDO = 'redo'
+
+# the levels of a new game
+LEVELS = range(1, 11)
+
+# the codes of tiles stored in the board. 0 to 8 are the number of surrounding pokemon
+CELL_UNEXPOSED = 9
+CELL_FLAG = 10
+CELL_POKEMON = 11
+CELL_SYMBOLS = tuple(str(count) for count in range(9)) + (UNEXPOSED, FLAG, POKEMON)
+SYMBOL_CELLS = {symbol: code for code, symbol in enumerate(CELL_SYMBOLS)}
+
+
+def board_index(index, grid_size):
+    '''
+    :param index: an index of a row or a column, which could be negative like an index of a list
+    :param grid_size: the size of the board
+    :return: the index from 0 to grid_size - 1
+    '''
+    try:
+        return range(grid_size)[index]
+    except IndexError:
+        raise IndexError('board index out of range') from None
+
+
+class BoardRow(object):
+    '''
+    A view over one row of the tiles stored in a bytearray. it behaves like a list of symbols, so it could be
+    indexed from the end and sliced, but its size could not be changed
+    '''
+
+    def __init__(self, cells, offset, grid_size):
+        '''
+        :param cells: the bytearray storing the codes of all the tiles
+        :param offset: the index of the first tile of the row
+        :param grid_size: the size of the board
+        '''
+        self.cells = cells
+        self.offset = offset
+        self.grid_size = grid_size
+
+    def __len__(self):
+        return self.grid_size
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [CELL_SYMBOLS[self.cells[self.offset + i]] for i in range(self.grid_size)[y]]
+        return CELL_SYMBOLS[self.cells[self.offset + board_index(y, self.grid_size)]]
+
+    def __setitem__(self, y, symbol):
+        if isinstance(y, slice):
+            indexes = range(self.grid_size)[y]
+            codes = [SYMBOL_CELLS[item] for item in symbol]
+            if len(codes) != len(indexes):
+                raise ValueError(f'a row of the board could not be resized, '
+                                 f'{len(codes)} symbols were given for {len(indexes)} tiles')
+            for i, code in zip(indexes, codes):
+                self.cells[self.offset + i] = code
+            return
+        self.cells[self.offset + board_index(y, self.grid_size)] = SYMBOL_CELLS[symbol]
+
+    def __iter__(self):
+        return (CELL_SYMBOLS[code] for code in self.cells[self.offset:self.offset + self.grid_size])
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class BoardGrid(object):
+    '''
+    A two-dimensional view over the tiles stored in a bytearray. it behaves like the list of lists of symbols
+    which was used as the display board, but nothing is converted until a tile is read. a slice of it is a list
+    of rows, and the rows could not be replaced
+    '''
+
+    def __init__(self, cells, grid_size):
+        '''
+        :param cells: the bytearray storing the codes of all the tiles
+        :param grid_size: the size of the board
+        '''
+        self.cells = cells
+        self.grid_size = grid_size
+
+    def __len__(self):
+        return self.grid_size
+
+    def __getitem__(self, x):
+        if isinstance(x, slice):
+            return [BoardRow(self.cells, i * self.grid_size, self.grid_size) for i in range(self.grid_size)[x]]
+        return BoardRow(self.cells, board_index(x, self.grid_size) * self.grid_size, self.grid_size)
+
+    def __iter__(self):
+        return (self[x] for x in range(self.grid_size))
+
+    def __repr__(self):
+        return repr(self.tolist())
+
+    def tolist(self):
+        '''
+        :return: the board as a two-dimensional list of symbols
+        '''
+        return [list(row) for row in self]
+
+
+class BoardModel(object):
+    '''
+    To stimulate the internal process of the pokemon game
+    '''
+
+    def __init__(self, grid_size, num_pokemon, pokemon=None, counts=None, seed=None):
+        '''
+        To construct a BoardModel class to complete the internal process of the pokemon game
+
+        :param grid_size: the size of the game. it is related to the number of tile
+        :param num_pokemon: refer to the number of pokemon hidden in the game board
+        :param pokemon: the indexes of pokemon. they are generated randomly by default
+        :param counts: the number of pokemon surrounding every tile for the given pokemon, like a record of
+                       a corpus. it is counted again by default. any object indexed like a bytearray could be used
+        :param seed: the seed generating the pokemon, so the same board could be generated again
+
+        Attribution:
+            displayBoard: the board would be showed in the window. it is a two-dimensional view over cells
+            cells: a bytearray recording the code of every tile
+            num_pokemon: record the number of pokemon hidden in the board
+            left_pokemon: record the number of rest pokemon hidden in the board
+            state: determine if the game stop
+            loss: determine if the player loss in the game
+            isWorking:  determine if the game board can be changed
+            grid_size: the size the game board
+            pokemon: a list of pokemon's positions. it is a view over pokemon_set
+            hidden_pokemon: a list of pokemon that still hide. it is a view over hidden_set
+            pokemon_set: a set of pokemon's positions to check if a tile hides a pokemon
+            hidden_set: a set of pokemon that still hide
+            counts: a bytearray recording the number of pokemon surrounding every tile
+            listeners: a dictionary from an event to the callbacks waiting for it
+            seed: the seed of the pokemon, or None if they were not generated from a seed
+            correct_flags: the number of catches on a pokemon
+            wrong_flags: the number of catches on a tile without pokemon
+            revealed: the number of exposed tiles without pokemon
+        '''
+        self.cells = bytearray((CELL_UNEXPOSED,)) * (grid_size ** 2)
+        self.num_pokemon = self.left_pokemon = num_pokemon
+        self.state = True
+        self.loss = False
+        self.isWorking = True
+        self.grid_size = grid_size
+        self.listeners = {}
+        self.seed = seed
+        if pokemon is None:
+            rng = random.Random(seed) if seed is not None else random
+            pokemon = self.generate_pokemon(grid_size, num_pokemon, rng)
+        self.pokemon_set = set(pokemon)
+        self.counts = counts if counts is not None else self.generate_counts(grid_size, self.pokemon_set)
+        self.hidden_set = set(self.pokemon_set)
+        self.correct_flags = self.wrong_flags = self.revealed = 0
+
+    @property
+    def pokemon(self):
+        '''
+        :return: a list of pokemon's positions
+        '''
+        return sorted(self.pokemon_set)
+
+    @pokemon.setter
+    def pokemon(self, pokemon):
+        '''
+        set the positions of pokemon and count the pokemon surrounding every tile again
+
+        :param pokemon: a list of pokemon's positions
+        '''
+        self.pokemon_set = set(pokemon)
+        self.counts = self.generate_counts(self.grid_size, self.pokemon_set)
+        self.recount()
+
+    @property
+    def hidden_pokemon(self):
+        '''
+        :return: a list of pokemon that still hide
+        '''
+        return sorted(self.hidden_set)
+
+    @hidden_pokemon.setter
+    def hidden_pokemon(self, hidden_pokemon):
+        '''
+        :param hidden_pokemon: a list of pokemon that still hide
+        '''
+        self.hidden_set = set(hidden_pokemon)
+
+    @property
+    def displayBoard(self):
+        '''
+        :return: a two-dimensional view over the tiles of the board
+        '''
+        return BoardGrid(self.cells, self.grid_size)
+
+    @displayBoard.setter
+    def displayBoard(self, board):
+        '''
+        :param board: a two-dimensional list of symbols
+        '''
+        cells = bytes(SYMBOL_CELLS[tile] for row in board for tile in row)
+        assert len(cells) == self.grid_size ** 2
+        self.cells[:] = cells
+        self.recount()
+
+    def recount(self):
+        '''
+        count the catches and the exposed tiles again from the cells. the counters are kept by every action,
+        so it is only needed after the cells or the pokemon are replaced at once, like when a game is loaded
+        '''
+        cells = self.cells
+        self.correct_flags = sum(1 for index in self.pokemon_set if cells[index] == CELL_FLAG)
+        self.wrong_flags = cells.count(CELL_FLAG) - self.correct_flags
+        self.revealed = len(cells) - cells.count(CELL_UNEXPOSED) - cells.count(CELL_FLAG) - cells.count(CELL_POKEMON)
+
+    def subscribe(self, event, callback):
+        '''
+        register a callback which would be called when the event happens. it is called without parameters,
+        except for EVENT_MOVE which gives the action, the position and the list of the positions changed
+
+        :param event: EVENT_POKEMON when the number of left pokemon changed, EVENT_WON, EVENT_LOST or EVENT_MOVE
+        :param callback: a function
+        '''
+        callbacks = self.listeners.setdefault(event, [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def unsubscribe(self, event, callback):
+        '''
+        remove a callback registered by subscribe
+
+        :param event: the event of the callback
+        :param callback: a function
+        '''
+        callbacks = self.listeners.get(event, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def publish(self, event, *args):
+        '''
+        call all the callbacks waiting for the event
+
+        :param event: the event happened
+        :param args: the parameters given to the callbacks
+        '''
+        for callback in list(self.listeners.get(event, [])):
+            callback(*args)
+
+    def get_board(self):
+        '''
+        :return: the attribution: displayBoard
+        '''
+        return self.displayBoard
+
+    def get_left_pokemon(self):
+        '''
+        :return: the attribution: left_pokemon
+        '''
+        return self.left_pokemon
+
+    def get_num_pokemon(self):
+        '''
+        :return: the attribution: num_pokemon
+        '''
+        return self.num_pokemon
+
+    def get_game(self):
+        '''
+        :return: the attribution: state
+        '''
+        return self.state
+
+    def get_pokemon_location(self):
+        '''
+        :return: the attribution: pokemon
+        '''
+        return self.pokemon
+
+    def get_num_attempted_catches(self):
+        '''
+
+        :return: the number of catches were used on the board
+        '''
+        return self.num_pokemon - self.left_pokemon
+
+    def get_item(self, position: tuple):
+        '''
+        :param position: a tuple that like (x, y)
+        :return: the content of the position on the board
+        '''
+        return CELL_SYMBOLS[self.cells[self.position_to_index(position)]]
+
+    def generate_pokemon(self, grid_size, num_pokemon, rng=random):
+        '''
+        The method is used to randomly generate the list of pokemon hidden in the game board
+        the list records the index
+
+        :param grid_size: the size of the board
+        :param num_pokemon:  the number of pokemon generate on the board
+        :param rng: a random.Random generating the pokemon. the global random module is used by default
+        :return: randomly generate a list that records the index of every pokemon
+        '''
+        assert num_pokemon <= grid_size ** 2
+        pokemon = rng.sample(range(0, grid_size ** 2), num_pokemon)
+        return pokemon
+
+    def generate_counts(self, grid_size, pokemon):
+        '''
+        The method is used to count the pokemon surrounding every tile once, so that the count of a tile
+        can be looked up instead of checking its neighbours on every click. it is counted by count_neighbours
+
+        :param grid_size: the size of the board
+        :param pokemon: a collection that records the index of every pokemon
+        :return: a bytearray that records the number of pokemon surrounding every index
+        '''
+        flags = bytearray(grid_size ** 2)
+        for index in pokemon:
+            flags[index] = 1
+        return count_neighbours(flags, grid_size)
+
+    def set_state(self, Boolean):
+        '''
+        Set the state of the game
+
+        :param Boolean: True or False
+        '''
+        self.state = Boolean
+
+    def triggle_isworking(self, Bool):
+        '''
+        Set the attribution isWorking of the game
+
+        :param Bool: True or False
+        '''
+        self.isWorking = Bool
+
+    def is_on_board(self, position):
+        '''
+        To ensure the input position is within the board
+
+        :param position: a tuple like (x, y)
+        :return: if the positon is within the board return True else return False
+        '''
+
+        x, y = position
+        if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
+            return True
+        else:
+            return False
+
+    def reset_game(self):
+        '''
+        To re-generate a new game. It will generate the important parameter of BoardModel
+
+        :return: a list of the positions of the tiles changed
+        '''
+        changed = [self.index_to_position(index) for index, code in enumerate(self.cells) if code != CELL_UNEXPOSED]
+        self.cells[:] = bytearray((CELL_UNEXPOSED,)) * len(self.cells)
+        self.state = True
+        self.left_pokemon = self.num_pokemon
+        self.loss = False
+        self.triggle_isworking(True)
+        self.hidden_set = set(self.pokemon_set)
+        self.correct_flags = self.wrong_flags = self.revealed = 0
+        self.publish(EVENT_POKEMON)
+        self.publish(EVENT_MOVE, ACTION_RESET, None, changed)
+        return changed
+
+    def calculate_count(self, position: tuple):
+        '''
+        calculate how many pokemon surrounding the item in the position
+        :param position: a tuple like (x, y)
+        :return: the number of pokemon surrounding the position
+        '''
+
+        index = self.position_to_index(position)
+
+        assert index not in self.pokemon_set
+
+        return self.counts[index]
+
+    def left_click(self, position: tuple):
+        '''
+        To complete the operation in the game. left click would expose the number of pokemon surrounding the position
+        However, if a pokemon hide in the position, player would lose the game
+
+        :param position: a tuple like (x, y)
+        :return: a list of the positions of the tiles changed
+        '''
+
+        assert self.is_on_board(position)
+        changed = []
+        if self.isWorking:
+            if self.position_to_index(position) not in self.pokemon_set:
+                if self.get_item(position) == '~':
+                    statistic = self.calculate_count(position)
+                    if statistic == 0:
+                        changed = self.extend_zero(position)
+                    else:
+                        self.set_item(position, str(statistic))
+                        self.revealed += 1
+                        changed = [position]
+                    if self.check_win():
+                        # every tile without pokemon is exposed
+                        changed += [self.index_to_position(i) for i in self.pokemon_set]
+                        self.publish(EVENT_WON)
+            else:
+                self.loss = True
+                changed = self.show_all_pokemon()
+                self.publish(EVENT_LOST)
+            if changed:
+                self.publish(EVENT_MOVE, ACTION_LEFT, position, changed)
+        return changed
+
+    def right_click(self, position: tuple):
+        '''
+        To complete the operation in the game. right click would use a catch to cover the grass. if player cover
+        all the pokemon accurately, they would win the game
+        :param position: a tuple like (x, y)
+        :return: a list of the positions of the tiles changed
+        '''
+        assert position[0] < self.grid_size
+        assert position[1] < self.grid_size
+        changed = []
+        if self.isWorking:
+            index = self.position_to_index(position)
+            if self.get_item(position) == '~':
+                self.set_item(position, FLAG)
+                self.left_pokemon -= 1
+                changed = [position]
+
+                if index in self.pokemon_set:
+                    self.hidden_set.discard(index)
+                    self.correct_flags += 1
+                else:
+                    self.wrong_flags += 1
+                self.publish(EVENT_POKEMON)
+                if self.check_win():
+                    # every catch is on a pokemon, so the position is one of them
+                    changed = [self.index_to_position(i) for i in self.pokemon_set]
+                    self.publish(EVENT_WON)
+            elif self.get_item(position) == FLAG:
+                self.set_item(position, '~')
+                self.left_pokemon += 1
+                changed = [position]
+                if index in self.pokemon_set:
+                    self.hidden_set.add(index)
+                    self.correct_flags -= 1
+                else:
+                    self.wrong_flags -= 1
+                self.publish(EVENT_POKEMON)
+            if changed:
+                self.publish(EVENT_MOVE, ACTION_RIGHT, position, changed)
+        return changed
+
+    def extend_zero(self, current_position, pre_position=None):
+        '''
+        if players left click a tile which is zero, the method would extend other zero tiles connecting to that zero
+        title until not zero title
+        the tiles waiting for extending are kept in a stack instead of recursion, so a zero area of any size
+        is exposed in a single pass
+
+        :param current_position: the current zero tile position
+        :param pre_position: the last zero tile position. it is not used any more
+        :return: a list of the positions of all the tiles exposed
+        '''
+        if not self.is_on_board(current_position):
+            return []
+
+        grid_size = self.grid_size
+        counts = self.counts
+        cells = self.cells
+
+        index = self.position_to_index(current_position)
+        count = self.calculate_count(current_position)
+        # the code of an exposed tile is the number of pokemon surrounding it
+        cells[index] = count
+        opened = [current_position]
+        stack = [current_position] if count == 0 else []
+
+        while stack:
+            x, y = stack.pop()
+            for i, j in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if 0 <= i < grid_size and 0 <= j < grid_size:
+                    index = i * grid_size + j
+                    if cells[index] == CELL_UNEXPOSED:
+                        count = counts[index]
+                        cells[index] = count
+                        opened.append((i, j))
+                        if count == 0:
+                            stack.append((i, j))
+        self.revealed += len(opened)
+        return opened
+
+    def position_to_index(self, position):
+        '''
+        covert two-dimensional list to one-dimensional list
+
+        :param position: a tuple like (x, y)
+        :return: the corresponding index in one-dimensional list
+        '''
+        x, y = position
+        index = x * self.grid_size + y
+        return index
+
+    def index_to_position(self, index):
+        '''
+        covert one-dimensional list to two-dimensional list
+        :param index: a number in one-dimensional list
+        :return: the corresponding position in two-dimensional list
+        '''
+        x = index // self.grid_size
+        y = index % self.grid_size
+        return (x, y)
+
+    def set_item(self, position: tuple, symbol):
+        '''
+        to change the symbol on the corresponding position
+        :param position: a tuple like (x, y)
+        :param symbol: a global variable
+        '''
+        self.cells[self.position_to_index(position)] = SYMBOL_CELLS[symbol]
+
+    # the method is only used when game over
+    def show_all_pokemon(self):
+        '''
+        when game over, the method would show all the position of pokemon
+
+        :return: a list of the positions of the tiles changed
+        '''
+        changed = []
+        for i in self.pokemon_set:
+            position = self.index_to_position(i)
+            self.set_item(position, POKEMON)
+            changed.append(position)
+        return changed
+
+    def check_win(self):
+        '''
+        to check if the players win the game. the game is won when every catch is on a pokemon and every pokemon
+        is caught, or when every tile without pokemon is exposed. it only reads the counters, so it takes the same
+        time on a board of any size
+        :return: if it is win would return True, if not, it return False
+        '''
+        caught = self.correct_flags == self.num_pokemon and self.wrong_flags == 0
+        if self.state and (caught or self.revealed == len(self.cells) - self.num_pokemon):
+            if self.isWorking:
+                self.show_all_pokemon()
+                self.isWorking = False
+            return True
+        else:
+            return False
+
+    def check_lose(self):
+        '''
+        to check if the players lose the game
+        :return: if it is loss would return True, if not, it return False
+        '''
+        if self.loss and self.state:
+            self.isWorking = False
+            return True
+        else:
+            return False
+
+    def __str__(self):
+        matrix = ''
+        for i in self.get_board():
+            matrix += str(i)
+            matrix += '\n'
+        return matrix
+
+
+def level_size(level):
+    '''
+    :param level: a number in LEVELS
+    :return: a tuple of the size of the board of the level and its number of pokemon
+    '''
+    return 1 + level, 2 * level
+
+
+def level_board(level, board=BoardModel, seed=None):
+    '''
+    generate the game of a level
+
+    :param level: a number in LEVELS
+    :param board: the class of the game, like NoGuessBoard
+    :param seed: the seed of the pokemon
+    :return: a BoardModel of the size and the number of pokemon of the level
+    '''
+    grid_size, num_pokemon = level_size(level)
+    return board(grid_size, num_pokemon, seed=seed)
+
+
+def count_neighbours(flags, grid_size):
+    '''
+    count the flagged tiles surrounding every tile of one or more boards at once. the boards are put on one grid,
+    with an empty column after every row and an empty row after every board, and the grid is read as a big number
+    with a byte for every tile. the counts are then the sum of the grid shifted to the 8 directions, and no count
+    leaks into another row or board through the empty tiles
+
+    :param flags: a bytes-like object of 0 or 1 for every tile of the boards, one board after another
+    :param grid_size: the size of the boards
+    :return: a bytearray of the number of flagged tiles surrounding every tile
+    '''
+    size = grid_size ** 2
+    boards = len(flags) // size
+    width = grid_size + 1
+    # the empty row after every board, then the empty column after every row
+    rows = bytearray((size + grid_size) * boards)
+    for board in range(boards):
+        rows[board * (size + grid_size):board * (size + grid_size) + size] = flags[board * size:(board + 1) * size]
+    padded = bytearray(len(rows) // grid_size * width)
+    for column in range(grid_size):
+        padded[column::width] = rows[column::grid_size]
+
+    grid = int.from_bytes(padded, 'little')
+    total = 0
+    for shift in (1, width - 1, width, width + 1):
+        total += (grid << 8 * shift) + (grid >> 8 * shift)
+    summed = total.to_bytes(len(padded) + width + 1, 'little')
+
+    for column in range(grid_size):
+        rows[column::grid_size] = summed[column:len(padded):width]
+    counts = bytearray(len(flags))
+    for board in range(boards):
+        counts[board * size:(board + 1) * size] = rows[board * (size + grid_size):board * (size + grid_size) + size]
+    return counts
@@ -0,0 +1,216 @@
+'''
+    The undo and redo of the clicks of a game. a click is kept as the diff of the tiles it changed, the indexes
+    with their codes before and after it, so the history grows with the tiles changed and not with the size of
+    the board. a flood of thousands of tiles is one step, and undone or redone at once
+'''
+from array import array
+
+from .engine import (EVENT_POKEMON, EVENT_MOVE, ACTION_LEFT, ACTION_RIGHT, ACTION_RESET, ACTION_UNDO, ACTION_REDO,
+                     CELL_UNEXPOSED, CELL_FLAG, CELL_POKEMON, BoardModel)
+
+
+def counters(game: BoardModel):
+    '''
+    :param game: the game
+    :return: a tuple of everything else a click could change
+    '''
+    return (game.left_pokemon, game.correct_flags, game.wrong_flags, game.revealed, game.loss, game.isWorking,
+            game.state)
+
+
+def codes_before(game: BoardModel, action, position, indexes):
+    '''
+    find the codes of the changed tiles before a click from the board after it. a left click only exposes
+    unexposed tiles, and the pokemon it shows were caught if they do not hide any more. a right click toggles
+    the catch of one tile, or shows the pokemon when the last one is caught
+
+    :param game: the game after the click
+    :param action: ACTION_LEFT or ACTION_RIGHT
+    :param position: the position of the click
+    :param indexes: the indexes of the changed tiles
+    :return: the bytes of the codes
+    '''
+    cells = game.cells
+    clicked = game.position_to_index(position)
+    if action == ACTION_LEFT:
+        if game.pokemon_set.isdisjoint(indexes):
+            return bytes((CELL_UNEXPOSED,)) * len(indexes)
+        return bytes(CELL_FLAG if i in game.pokemon_set and i not in game.hidden_set else CELL_UNEXPOSED
+                     for i in indexes)
+    if cells[clicked] == CELL_POKEMON:
+        # every pokemon was caught before, except the one caught by the click
+        return bytes(CELL_UNEXPOSED if i == clicked else CELL_FLAG for i in indexes)
+    return bytes((CELL_UNEXPOSED if cells[clicked] == CELL_FLAG else CELL_FLAG,))
+
+
+class History(object):
+    '''
+    To undo and redo the clicks of a game. a step is a tuple of the action, the position, the indexes of the
+    changed tiles, their codes before and after the click, the counters before and after the click, and the
+    pokemon placed by the click or None.
+
+    when the click placing the pokemon of a NoGuessBoard is undone, the pokemon are taken away, so the next
+    first click is protected again and the clicks before it are undone on a board without pokemon like they
+    were made. the pokemon are put back when it is redone
+
+    Attribution:
+        game: the game whose clicks are kept, or None
+        practice: determine if a click which lost or won the game could be undone
+        limit: the most steps kept, or None to keep all of them
+        done: a list of the steps which could be undone. the last one is the latest click
+        undone: a list of the steps which could be redone. the last one was undone latest
+        after: the counters after the latest step
+        placed: determine if the pokemon were placed after the latest step
+        used: determine if a click was undone in the game
+    '''
+
+    def __init__(self, practice=False, limit=None):
+        '''
+        :param practice: if it is True, a click which lost or won the game could be undone
+        :param limit: the most steps kept, or None to keep all of them
+        '''
+        self.game = None
+        self.practice = practice
+        self.limit = limit
+        self.done = []
+        self.undone = []
+        self.after = None
+        self.placed = True
+        self.used = False
+
+    def attach(self, game: BoardModel):
+        '''
+        start keeping the clicks of a game. the history is kept if it is the same game
+
+        :param game: the game
+        '''
+        if game is self.game:
+            return
+        self.detach()
+        self.game = game
+        self.clear()
+        game.subscribe(EVENT_MOVE, self.record)
+
+    def detach(self):
+        '''
+        stop keeping the clicks of the game
+        '''
+        if self.game is not None:
+            self.game.unsubscribe(EVENT_MOVE, self.record)
+            self.game = None
+
+    def clear(self):
+        '''
+        forget all the steps
+        '''
+        self.done.clear()
+        self.undone.clear()
+        self.after = counters(self.game) if self.game is not None else None
+        self.placed = getattr(self.game, 'placed', True)
+        self.used = False
+
+    def record(self, action, position, changed):
+        '''
+        keep a click as a step. it is called by the game after every move
+
+        :param action: the action of the move
+        :param position: a tuple like (x, y), or None
+        :param changed: a list of the positions changed
+        '''
+        if action in (ACTION_UNDO, ACTION_REDO):
+            return
+        if action == ACTION_RESET:
+            self.clear()
+            return
+        game = self.game
+        grid_size = game.grid_size
+        indexes = array('I', [x * grid_size + y for x, y in changed])
+        before = codes_before(game, action, position, indexes)
+        after = bytes(map(game.cells.__getitem__, indexes))
+        layout = game.pokemon if not self.placed and getattr(game, 'placed', True) else None
+        self.done.append((action, position, indexes, before, after, self.after, counters(game), layout))
+        self.after = counters(game)
+        self.placed = getattr(game, 'placed', True)
+        self.undone.clear()
+        if self.limit is not None and len(self.done) > self.limit:
+            del self.done[0]
+
+    def can_undo(self):
+        '''
+        :return: True if there is a click to undo. a click of a finished game is only undone in practice
+        '''
+        over = self.game is not None and (self.game.loss or not self.game.isWorking or not self.game.state)
+        return bool(self.done) and (self.practice or not over)
+
+    def can_redo(self):
+        '''
+        :return: True if there is an undone click to redo
+        '''
+        return bool(self.undone)
+
+    def apply(self, indexes, codes, state):
+        '''
+        change the tiles of a step and the counters at once
+
+        :param indexes: the indexes of the tiles
+        :param codes: the new codes of the tiles
+        :param state: the new counters
+        :return: a list of the positions changed
+        '''
+        game = self.game
+        cells = game.cells
+        for index, code in zip(indexes, codes):
+            cells[index] = code
+        for index in game.pokemon_set.intersection(indexes):
+            # a shown pokemon keeps hiding or not as before it was shown
+            if cells[index] == CELL_FLAG:
+                game.hidden_set.discard(index)
+            elif cells[index] == CELL_UNEXPOSED:
+                game.hidden_set.add(index)
+        (game.left_pokemon, game.correct_flags, game.wrong_flags, game.revealed, game.loss, game.isWorking,
+         game.state) = state
+        self.after = counters(game)
+        return [divmod(index, game.grid_size) for index in indexes]
+
+    def undo(self):
+        '''
+        undo the latest click
+
+        :return: a list of the positions changed, which is empty if nothing could be undone
+        '''
+        if not self.can_undo():
+            return []
+        step = self.done.pop()
+        action, position, indexes, before, after, state_before, state_after, layout = step
+        if layout is not None:
+            self.game.unplace()
+            self.placed = False
+        changed = self.apply(indexes, before, state_before)
+        self.undone.append(step)
+        self.used = True
+        self.game.publish(EVENT_POKEMON)
+        self.game.publish(EVENT_MOVE, ACTION_UNDO, position, changed)
+        return changed
+
+    def redo(self):
+        '''
+        redo the latest undone click
+
+        :return: a list of the positions changed, which is empty if nothing could be redone
+        '''
+        if not self.can_redo():
+            return []
+        step = self.undone.pop()
+        action, position, indexes, before, after, state_before, state_after, layout = step
+        if layout is not None:
+            self.game.arrange(layout)
+            self.placed = True
+        changed = self.apply(indexes, after, state_after)
+        clicked = self.game.position_to_index(position)
+        if self.game.cells[clicked] == CELL_POKEMON and action == ACTION_RIGHT:
+            # the last pokemon was caught before all of them were shown
+            self.game.hidden_set.discard(clicked)
+        self.done.append(step)
+        self.game.publish(EVENT_POKEMON)
+        self.game.publish(EVENT_MOVE, ACTION_REDO, position, changed)
+        return changed
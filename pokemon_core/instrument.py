@@ -0,0 +1,283 @@
+'''
+    An opt-in instrumentation of the game. every action of the player is timed from the event to the end of the
+    layout, and the time is broken down into stages like the click of the model or the redraw of the view.
+    the recent times of every action and stage are kept in rolling histograms which could be dumped to a file,
+    and one action could be captured by cProfile
+
+    nothing is changed unless it is enabled, because the methods are only wrapped by an enabled Instrument.
+    it is enabled by the environment, for example POKEMON_INSTRUMENT=instrument.json POKEMON_PROFILE=click
+'''
+import cProfile
+import collections
+import functools
+import json
+import os
+import time
+
+# the path of the dump file, or 1 to dump to DEFAULT_PATH
+ENVIRONMENT = 'POKEMON_INSTRUMENT'
+# the name of the action captured by cProfile
+PROFILE_ENVIRONMENT = 'POKEMON_PROFILE'
+# the actions of the player timed by the game window
+ACTIONS = ('click', 'flag', 'restart')
+DEFAULT_PATH = 'instrument.json'
+# the number of recent samples kept in a histogram
+WINDOW = 1000
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram(object):
+    '''
+    To keep the recent samples of a value and find its percentiles
+
+    Attribution:
+        samples: the recent samples. the oldest one is dropped when the window is full
+        count: the number of all samples added
+    '''
+
+    def __init__(self, window=WINDOW):
+        '''
+        :param window: the number of recent samples kept
+        '''
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+
+    def add(self, value):
+        '''
+        :param value: a new sample
+        '''
+        self.samples.append(value)
+        self.count += 1
+
+    def percentile(self, p, ordered=None):
+        '''
+        :param p: a percentile from 0 to 100
+        :param ordered: the sorted samples if they were already sorted
+        :return: the smallest sample which is not smaller than p percent of the recent samples, or None
+        '''
+        ordered = ordered if ordered is not None else sorted(self.samples)
+        if not ordered:
+            return None
+        return ordered[max(0, -(-p * len(ordered) // 100) - 1)]
+
+    def summary(self, scale=1):
+        '''
+        :param scale: a number multiplying every sample, for example 1000 to show seconds in millisecond
+        :return: a dictionary of the count, the percentiles and the biggest of the recent samples
+        '''
+        ordered = sorted(self.samples)
+        summary = {'count': self.count}
+        for p in PERCENTILES:
+            value = self.percentile(p, ordered)
+            summary[f'p{p}'] = value * scale if value is not None else None
+        summary['max'] = ordered[-1] * scale if ordered else None
+        return summary
+
+
+class Instrument(object):
+    '''
+    To time the actions of the player and their stages. a stage only counts inside an action, and a stage called
+    again inside itself, like the redraw of a subclass calling the redraw of its base, is timed once
+
+    Attribution:
+        window: the number of recent samples kept in every histogram
+        profile: the name of the action captured by cProfile, or None
+        profiler: the cProfile.Profile of the captured action, or None
+        actions: a dictionary from the name of an action to the histogram of its seconds
+        stages: a dictionary from the name of an action to a dictionary from a stage to the histogram of its seconds
+        calls: a dictionary from the name of an action to the histogram of its Tk calls
+        current: the name of the running action, or None
+        totals: a dictionary from a stage to its seconds in the running action
+        running: the set of the stages running now
+        counted: the number of Tk calls in the running action
+        wrapped: a list of tuples of the owner, the attribute and the original of every wrapped method
+    '''
+
+    def __init__(self, window=WINDOW, profile=None):
+        '''
+        :param window: the number of recent samples kept in every histogram
+        :param profile: the name of the action captured by cProfile, or None
+        '''
+        self.window = window
+        self.profile = profile
+        self.profiler = cProfile.Profile() if profile is not None else None
+        self.actions = {}
+        self.stages = {}
+        self.calls = {}
+        self.current = None
+        self.totals = {}
+        self.running = set()
+        self.counted = 0
+        self.wrapped = []
+
+    def action(self, name, function, *args, **kwargs):
+        '''
+        call a function as an action of the player. an action inside another one is a part of the outer one
+
+        :param name: the name of the action
+        :param function: the function
+        :return: the result of the function
+        '''
+        if self.current is not None:
+            return function(*args, **kwargs)
+        self.current, self.totals, self.counted = name, {}, 0
+        profiling = name == self.profile
+        if profiling:
+            self.profiler.enable()
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiling:
+                self.profiler.disable()
+            self.histogram(self.actions, name).add(elapsed)
+            self.histogram(self.calls, name).add(self.counted)
+            stages = self.stages.setdefault(name, {})
+            for stage, seconds in self.totals.items():
+                self.histogram(stages, stage).add(seconds)
+            self.current = None
+
+    def stage(self, name, function, *args, **kwargs):
+        '''
+        call a function as a stage of the running action
+
+        :param name: the name of the stage
+        :param function: the function
+        :return: the result of the function
+        '''
+        if self.current is None or name in self.running:
+            return function(*args, **kwargs)
+        self.running.add(name)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            self.totals[name] = self.totals.get(name, 0) + time.perf_counter() - start
+            self.running.discard(name)
+
+    def count(self):
+        '''
+        count a Tk call of the running action
+        '''
+        if self.current is not None:
+            self.counted += 1
+
+    def histogram(self, histograms, name):
+        '''
+        :param histograms: a dictionary from a name to a Histogram
+        :param name: the name
+        :return: the Histogram of the name. it is created if it does not exist
+        '''
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = Histogram(self.window)
+        return histogram
+
+    def wrap(self, owner, attribute, wrapper):
+        '''
+        replace a method by a wrapper of it. the method is only wrapped where it is defined, so a method of
+        a subclass which is not overridden is not wrapped twice
+
+        :param owner: the class or the module of the method
+        :param attribute: the name of the method
+        :param wrapper: a function taking the original method and returning the new one
+        '''
+        original = vars(owner).get(attribute)
+        if original is None:
+            return
+        self.wrapped.append((owner, attribute, original))
+        setattr(owner, attribute, functools.wraps(original)(wrapper(original)))
+
+    def time_action(self, owner, attribute, name=None, after=None):
+        '''
+        time a method as an action
+
+        :param owner: the class of the method
+        :param attribute: the name of the method
+        :param name: the name of the action. it is the name of the method by default
+        :param after: a function called with the same arguments at the end of the action, like the layout of Tk
+        '''
+        name = name or attribute
+
+        def wrapper(original):
+            def action(*args, **kwargs):
+                def run():
+                    result = original(*args, **kwargs)
+                    if after is not None:
+                        after(*args, **kwargs)
+                    return result
+                return self.action(name, run)
+            return action
+        self.wrap(owner, attribute, wrapper)
+
+    def time_stage(self, owner, attribute, name=None):
+        '''
+        time a method as a stage
+
+        :param owner: the class of the method
+        :param attribute: the name of the method
+        :param name: the name of the stage. it is the name of the method by default
+        '''
+        name = name or attribute
+        self.wrap(owner, attribute, lambda original: lambda *args, **kwargs: self.stage(name, original,
+                                                                                        *args, **kwargs))
+
+    def count_calls(self, owner, attribute):
+        '''
+        count the calls of a method as Tk calls
+
+        :param owner: the class of the method
+        :param attribute: the name of the method
+        '''
+        def wrapper(original):
+            def call(*args, **kwargs):
+                self.count()
+                return original(*args, **kwargs)
+            return call
+        self.wrap(owner, attribute, wrapper)
+
+    def unwrap(self):
+        '''
+        put back all the wrapped methods
+        '''
+        while self.wrapped:
+            owner, attribute, original = self.wrapped.pop()
+            setattr(owner, attribute, original)
+
+    def report(self):
+        '''
+        :return: a dictionary of the histograms of every action in millisecond, its stages and its Tk calls
+        '''
+        return {name: {'milliseconds': histogram.summary(1000),
+                       'stages': {stage: stages.summary(1000) for stage, stages in self.stages[name].items()},
+                       'tk_calls': self.calls[name].summary()}
+                for name, histogram in self.actions.items()}
+
+    def dump(self, path):
+        '''
+        write the report to a json file. the capture of cProfile is written next to it with .prof, and could be
+        read by pstats
+
+        :param path: the path of the file
+        '''
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({'window': self.window, 'actions': self.report()}, file, indent=2)
+        os.replace(temporary, path)
+        if self.profiler is not None:
+            self.profiler.dump_stats(f'{path}.prof')
+
+
+def from_environment(environ=os.environ):
+    '''
+    :param environ: the environment
+    :return: a tuple of an Instrument and the path of its dump file, or (None, None) if it is not enabled
+    '''
+    path = environ.get(ENVIRONMENT)
+    if not path:
+        return None, None
+    profile = environ.get(PROFILE_ENVIRONMENT) or None
+    if profile is not None and profile not in ACTIONS:
+        raise ValueError(f'{PROFILE_ENVIRONMENT} must be one of {", ".join(ACTIONS)}, not {profile!r}')
+    return Instrument(profile=profile), DEFAULT_PATH if path == '1' else path
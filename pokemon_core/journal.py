@@ -0,0 +1,165 @@
+'''
+    The autosave of a running game. every move is appended to a journal file as a record of fixed size,
+    and the whole game is saved as a snapshot after some moves. after a crash, the game is restored
+    by loading the snapshot and replaying the moves in the journal
+'''
+import os
+import struct
+import zlib
+
+from .engine import EVENT_MOVE, ACTION_LEFT, ACTION_RIGHT, ACTION_RESET, ACTION_UNDO, ACTION_REDO, BoardModel
+from .savefile import CHECKSUM, save_game, load_game
+
+MAGIC = b'PKMNJRNL'
+VERSION = 1
+# magic, version, the checksum of the snapshot the journal follows
+HEADER = struct.Struct('<8sHxxI')
+# action, x, y, time, the checksum of the record
+RECORD = struct.Struct('<c3xIIII')
+ACTION_CODES = {ACTION_LEFT: b'L', ACTION_RIGHT: b'R'}
+CODE_ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+# the number of moves appended before a new snapshot
+SNAPSHOT_EVERY = 200
+
+
+class Journal(object):
+    '''
+    To autosave a game. the snapshot is saved at the path and the journal next to it
+
+    Attribution:
+        path: the path of the snapshot
+        journal_path: the path of the journal
+        clock: a function returning the seconds played
+        snapshot_every: the number of moves appended before a new snapshot
+        sync: determine if every record is forced to the disk, not only to the system
+        game: the game being saved
+        file: the journal opened for appending
+        moves: the number of moves appended since the snapshot
+        placed: determine if the pokemon of the game were placed at the snapshot
+    '''
+
+    def __init__(self, path, clock=None, snapshot_every=SNAPSHOT_EVERY, sync=False):
+        '''
+        :param path: the path of the snapshot
+        :param clock: a function returning the seconds played. the time is 0 by default
+        :param snapshot_every: the number of moves appended before a new snapshot
+        :param sync: determine if every record is forced to the disk. it is much slower
+        '''
+        self.path = path
+        self.journal_path = f'{path}.journal'
+        self.clock = clock if clock is not None else (lambda: 0)
+        self.snapshot_every = snapshot_every
+        self.sync = sync
+        self.game = None
+        self.file = None
+        self.moves = 0
+        self.placed = True
+
+    def attach(self, game: BoardModel):
+        '''
+        start saving a game. it is saved as a snapshot at once
+
+        :param game: the game
+        '''
+        self.detach()
+        self.game = game
+        game.subscribe(EVENT_MOVE, self.record)
+        self.snapshot()
+
+    def detach(self):
+        '''
+        stop saving the game. the files are kept
+        '''
+        if self.game is not None:
+            self.game.unsubscribe(EVENT_MOVE, self.record)
+            self.game = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def snapshot(self, time=None):
+        '''
+        save the whole game and begin a new journal after it
+
+        :param time: the seconds played. it is read from the clock by default
+        '''
+        data = save_game(self.path, self.game, time if time is not None else self.clock())
+        if self.file is not None:
+            self.file.close()
+        # the old journal does not match the new snapshot any more, so it is never replayed after it
+        self.file = open(self.journal_path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, CHECKSUM.unpack_from(data, len(data) - CHECKSUM.size)[0]))
+        self.file.flush()
+        self.moves = 0
+        self.placed = getattr(self.game, 'placed', True)
+
+    def record(self, action, position, changed=None):
+        '''
+        append a move to the journal. it is called by the game after every move
+
+        :param action: the action of the move
+        :param position: a tuple like (x, y)
+        :param changed: a list of the positions changed. it is not used
+        '''
+        if action == ACTION_RESET:
+            # the time starts again from 0
+            self.snapshot(0)
+            return
+        if action in (ACTION_UNDO, ACTION_REDO):
+            # an undone click could not be replayed from the journal
+            self.snapshot()
+            return
+        over = self.game.loss or not self.game.isWorking
+        if getattr(self.game, 'placed', True) != self.placed or (not over and self.moves >= self.snapshot_every):
+            # the pokemon placed at the first click could not be replayed, so they are saved in a snapshot,
+            # which keeps the result if the click finished the game. otherwise the last move of a game is appended
+            self.snapshot()
+            return
+        x, y = position
+        body = RECORD.pack(ACTION_CODES[action], x, y, self.clock(), 0)[:-CHECKSUM.size]
+        self.file.write(body + CHECKSUM.pack(zlib.crc32(body)))
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+        self.moves += 1
+
+    def discard(self):
+        '''
+        stop saving the game and remove the files
+        '''
+        self.detach()
+        for path in (self.path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def restore(path):
+    '''
+    load the snapshot and replay the moves of the journal after it. a record cut short by a crash is left out
+
+    :param path: the path of the snapshot
+    :return: a tuple of the game and the seconds played, or None if there is no snapshot
+    '''
+    if not os.path.exists(path):
+        return None
+    game, time = load_game(path)
+    # a snapshot written before the result was saved in it is won again from its counters
+    game.check_win()
+    with open(path, 'rb') as file:
+        file.seek(-CHECKSUM.size, os.SEEK_END)
+        checksum = CHECKSUM.unpack(file.read())[0]
+    try:
+        with open(f'{path}.journal', 'rb') as file:
+            data = file.read()
+    except OSError:
+        return game, time
+    if len(data) < HEADER.size or HEADER.unpack_from(data) != (MAGIC, VERSION, checksum):
+        return game, time
+
+    for offset in range(HEADER.size, len(data) - RECORD.size + 1, RECORD.size):
+        code, x, y, moved, crc = RECORD.unpack_from(data, offset)
+        if code not in CODE_ACTIONS or crc != zlib.crc32(data[offset:offset + RECORD.size - CHECKSUM.size]):
+            break
+        getattr(game, CODE_ACTIONS[code])((x, y))
+        time = moved
+    return game, time
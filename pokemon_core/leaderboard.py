@@ -0,0 +1,140 @@
+'''
+    The high scores stored in a SQLite database. the scores of every board are indexed by time, and the number of
+    scores of every time is kept in another table, so the rank of a time is found without counting every score.
+    several games could write to the same database at once
+'''
+import sqlite3
+import time
+
+from .replay import Replay, unpack_recording
+
+# the seconds a writer waits for another one to finish
+TIMEOUT = 10
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    grid_size INTEGER NOT NULL,
+    num_pokemon INTEGER NOT NULL,
+    seconds INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    played REAL NOT NULL,
+    replay BLOB
+);
+CREATE INDEX IF NOT EXISTS scores_by_time ON scores (grid_size, num_pokemon, seconds, id);
+CREATE TABLE IF NOT EXISTS times (
+    grid_size INTEGER NOT NULL,
+    num_pokemon INTEGER NOT NULL,
+    seconds INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (grid_size, num_pokemon, seconds)
+) WITHOUT ROWID;
+'''
+
+
+class Leaderboard(object):
+    '''
+    To record and rank the scores of won games. a board is its size and its number of pokemon
+
+    Attribution:
+        path: the path of the database
+        connection: the connection to the database
+    '''
+
+    def __init__(self, path, timeout=TIMEOUT):
+        '''
+        To open the database, and create it if it does not exist
+
+        :param path: the path of the database
+        :param timeout: the seconds a writer waits for another one to finish
+        '''
+        self.path = path
+        # transactions are begun explicitly
+        self.connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        # readers do not wait for the writer, and a write does not wait for the disk twice
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+
+    def record(self, grid_size, num_pokemon, name, seconds, replay=None):
+        '''
+        record a score. the score and the count of its time are written in one transaction
+
+        :param grid_size: the size of the board
+        :param num_pokemon: the number of pokemon on the board
+        :param name: the name of the player
+        :param seconds: the time of the won game
+        :param replay: the bytes of the Recording of the game, or None
+        :return: a tuple of the id of the score and its rank
+        '''
+        cursor = self.connection.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.execute('INSERT INTO scores (grid_size, num_pokemon, seconds, name, played, replay) '
+                           'VALUES (?, ?, ?, ?, ?, ?)', (grid_size, num_pokemon, seconds, name, time.time(), replay))
+            score = cursor.lastrowid
+            cursor.execute('INSERT INTO times VALUES (?, ?, ?, 1) '
+                           'ON CONFLICT (grid_size, num_pokemon, seconds) DO UPDATE SET count = count + 1',
+                           (grid_size, num_pokemon, seconds))
+            rank = self.rank(grid_size, num_pokemon, seconds)
+            cursor.execute('COMMIT')
+        except BaseException:
+            cursor.execute('ROLLBACK')
+            raise
+        return score, rank
+
+    def rank(self, grid_size, num_pokemon, seconds):
+        '''
+        :param grid_size: the size of the board
+        :param num_pokemon: the number of pokemon on the board
+        :param seconds: a time
+        :return: the rank the time would have. it is one more than the number of faster scores
+        '''
+        faster, = self.connection.execute('SELECT COALESCE(SUM(count), 0) FROM times '
+                                          'WHERE grid_size = ? AND num_pokemon = ? AND seconds < ?',
+                                          (grid_size, num_pokemon, seconds)).fetchone()
+        return faster + 1
+
+    def top(self, grid_size, num_pokemon, k=3):
+        '''
+        :param grid_size: the size of the board
+        :param num_pokemon: the number of pokemon on the board
+        :param k: the number of scores
+        :return: a list of tuples of the name and the seconds of the fastest scores. the earlier one of
+                 two equal times is first
+        '''
+        return self.connection.execute('SELECT name, seconds FROM scores WHERE grid_size = ? AND num_pokemon = ? '
+                                       'ORDER BY seconds, id LIMIT ?', (grid_size, num_pokemon, k)).fetchall()
+
+    def count(self, grid_size, num_pokemon):
+        '''
+        :param grid_size: the size of the board
+        :param num_pokemon: the number of pokemon on the board
+        :return: the number of scores of the board
+        '''
+        total, = self.connection.execute('SELECT COALESCE(SUM(count), 0) FROM times '
+                                         'WHERE grid_size = ? AND num_pokemon = ?',
+                                         (grid_size, num_pokemon)).fetchone()
+        return total
+
+    def verify(self, score):
+        '''
+        replay the recording of a score to check its time
+
+        :param score: the id of the score
+        :return: True if the recorded game was won in the time of the score, None if it has no recording
+        '''
+        grid_size, num_pokemon, seconds, replay = self.connection.execute(
+            'SELECT grid_size, num_pokemon, seconds, replay FROM scores WHERE id = ?', (score,)).fetchone()
+        if replay is None:
+            return None
+        recording = unpack_recording(replay)
+        if (recording.grid_size, recording.num_pokemon) != (grid_size, num_pokemon):
+            return False
+        return Replay(recording).verify(seconds)
+
+    def close(self):
+        '''
+        close the database
+        '''
+        self.connection.close()
@@ -0,0 +1,231 @@
+'''
+    A load generator for pokemon_core.server. every session plays random clicks and flags on its own game and
+    starts a new game when one is over. the sessions share a few connections and send their requests without
+    waiting for the others, so the server is kept busy. the requests per second and the percentiles of the
+    latency are reported for every number of sessions
+
+    usage: python -m pokemon_core.loadgen --sessions 10 100 1000 --spawn
+'''
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import sys
+import time
+
+from .instrument import Histogram
+from .server import HOST, PORT, MAX_LINE
+
+# the share of requests which are flags, and which save the game
+FLAG_RATE = 0.2
+SAVE_RATE = 0.01
+
+
+class Client(object):
+    '''
+    A connection to the server. many requests could wait for their responses at once, and every response is
+    matched to its request by the id
+
+    Attribution:
+        reader: the asyncio.StreamReader of the connection
+        writer: the asyncio.StreamWriter of the connection
+        ids: a counter of the ids of requests
+        waiting: a dictionary from the id of a request to the future of its response
+        listener: the task reading the responses
+    '''
+
+    def __init__(self, reader, writer):
+        '''
+        :param reader: the asyncio.StreamReader of the connection
+        :param writer: the asyncio.StreamWriter of the connection
+        '''
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.waiting = {}
+        self.listener = asyncio.get_running_loop().create_task(self.listen())
+
+    @classmethod
+    async def connect(cls, host=HOST, port=PORT):
+        '''
+        :param host: the address of the server
+        :param port: the port of the server
+        :return: a new Client
+        '''
+        reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE * 16)
+        return cls(reader, writer)
+
+    async def listen(self):
+        '''
+        read the responses and give them to the requests waiting for them
+        '''
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                response = json.loads(line)
+                future = self.waiting.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('the server closed the connection'))
+            self.waiting.clear()
+
+    async def request(self, op, **params):
+        '''
+        send a request and wait for its response
+
+        :param op: the op of the request
+        :param params: the other fields of the request
+        :return: the dictionary of the response
+        '''
+        key = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[key] = future
+        self.writer.write(json.dumps(dict(params, id=key, op=op)).encode('utf-8') + b'\n')
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        '''
+        close the connection
+        '''
+        self.writer.close()
+        self.listener.cancel()
+
+
+async def play(client, requests, level, latencies, rng):
+    '''
+    play random clicks on games of a level as one session
+
+    :param client: the Client
+    :param requests: the number of requests sent
+    :param level: the level of the games
+    :param latencies: the Histogram of the seconds of every request
+    :param rng: the random generator
+    :return: the number of failed requests
+    '''
+    errors = 0
+    session = grid_size = None
+    for _ in range(requests):
+        if session is None:
+            op, params = 'new', {'level': level, 'seed': rng.getrandbits(32)}
+        elif rng.random() < SAVE_RATE:
+            op, params = 'save', {'session': session}
+        else:
+            op = 'flag' if rng.random() < FLAG_RATE else 'click'
+            params = {'session': session, 'x': rng.randrange(grid_size), 'y': rng.randrange(grid_size)}
+        start = time.perf_counter()
+        response = await client.request(op, **params)
+        latencies.add(time.perf_counter() - start)
+        if not response['ok']:
+            errors += 1
+            session = None
+        elif op == 'new':
+            session, grid_size = response['session'], response['grid_size']
+        elif response.get('state', 'playing') != 'playing':
+            session = None
+    if session is not None:
+        await client.request('close', session=session)
+    return errors
+
+
+async def run(sessions, requests=200, connections=64, level=9, host=HOST, port=PORT, seed=0):
+    '''
+    run some sessions at once against the server
+
+    :param sessions: the number of sessions
+    :param requests: the number of requests of every session
+    :param connections: the most connections shared by the sessions
+    :param level: the level of the games
+    :param host: the address of the server
+    :param port: the port of the server
+    :param seed: the seed of the random clicks
+    :return: a dictionary of the number of sessions, requests and errors, the requests per second
+             and the percentiles of the latency in millisecond
+    '''
+    clients = [await Client.connect(host, port) for _ in range(min(sessions, connections))]
+    latencies = Histogram(window=None)
+    start = time.perf_counter()
+    try:
+        errors = await asyncio.gather(*(play(clients[i % len(clients)], requests, level, latencies,
+                                             random.Random(f'{seed}-{i}'))
+                                        for i in range(sessions)))
+    finally:
+        for client in clients:
+            await client.close()
+    elapsed = time.perf_counter() - start
+    result = {'sessions': sessions, 'requests': latencies.count, 'errors': sum(errors),
+              'seconds': elapsed, 'requests_per_second': latencies.count / elapsed}
+    result.update({key: value for key, value in latencies.summary(1000).items() if key != 'count'})
+    return result
+
+
+async def wait_for_server(host, port, timeout=10):
+    '''
+    wait until the server accepts connections
+
+    :param host: the address of the server
+    :param port: the port of the server
+    :param timeout: the most seconds waited
+    '''
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main():
+    '''
+    To run the load generator from the command line
+    '''
+    parser = argparse.ArgumentParser(description='Send random games to pokemon_core.server and report the latency.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[10, 100, 1000],
+                        help='the numbers of sessions run at once')
+    parser.add_argument('--requests', type=int, default=200, help='the number of requests of every session')
+    parser.add_argument('--connections', type=int, default=64, help='the most connections shared by the sessions')
+    parser.add_argument('--level', type=int, default=9, help='the level of the games')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--spawn', action='store_true', help='start a server for the run and stop it after')
+    parser.add_argument('--output', default=None, help='write the results to this json file')
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        server = subprocess.Popen([sys.executable, '-m', 'pokemon_core.server', '--host', args.host,
+                                   '--port', str(args.port)], stdout=subprocess.DEVNULL)
+    results = []
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        for sessions in args.sessions:
+            result = asyncio.run(run(sessions, args.requests, args.connections, args.level, args.host, args.port,
+                                     args.seed))
+            results.append(result)
+            print(f"{sessions} sessions: {result['requests']} requests in {result['seconds']:.2f}s, "
+                  f"{result['requests_per_second']:.0f} requests/s, latency p50 {result['p50']:.2f}ms "
+                  f"p95 {result['p95']:.2f}ms p99 {result['p99']:.2f}ms max {result['max']:.2f}ms, "
+                  f"{result['errors']} errors")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
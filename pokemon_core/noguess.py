@@ -0,0 +1,233 @@
+'''
+    A board whose pokemon are placed at the first left click. the clicked tile and its neighbours never hide
+    a pokemon, and the layout is changed until the game could be finished by deduction from that click,
+    without any guess
+'''
+import random
+
+from .engine import UNEXPOSED, CELL_UNEXPOSED, CELL_FLAG, BoardModel
+from .solver import Solver
+
+# the number of new layouts tried when a layout could not be changed into one without guesses
+ATTEMPTS = 20
+
+
+def safe_zone(grid_size, num_pokemon, first):
+    '''
+    :param grid_size: the size of the board
+    :param num_pokemon: the number of pokemon
+    :param first: the index of the first clicked tile
+    :return: the set of indexes which hide no pokemon. it is the tile and its neighbours,
+             or only the tile if the board is too crowded for them
+    '''
+    x, y = first // grid_size, first % grid_size
+    zone = {i * grid_size + j
+            for i in range(max(x - 1, 0), min(x + 2, grid_size))
+            for j in range(max(y - 1, 0), min(y + 2, grid_size))}
+    if num_pokemon > grid_size ** 2 - len(zone):
+        zone = {first}
+    if num_pokemon > grid_size ** 2 - len(zone):
+        zone = set()
+    return zone
+
+
+def deduce(solver):
+    '''
+    play like the solver, but stop instead of guessing
+
+    :param solver: a Solver of the board
+    :return: True if the game is won, False if nothing could be deduced
+    '''
+    while not solver.is_over():
+        if solver.safe:
+            index = solver.safe.pop()
+            if solver.game.cells[index] == CELL_UNEXPOSED:
+                solver.expose(index)
+        elif solver.work:
+            solver.check_tile(solver.work.pop())
+        elif not (solver.check_subsets() or solver.check_remaining()):
+            return False
+    assert not solver.game.loss
+    return True
+
+
+def toggle(solver, index):
+    '''
+    put a pokemon on an unexposed tile or take it away, and update the counts and the exposed tiles around it.
+    the exposed tiles are checked by the solver again
+
+    :param solver: a Solver of the board
+    :param index: the index of an unexposed tile
+    '''
+    game = solver.game
+    if index in game.pokemon_set:
+        game.pokemon_set.discard(index)
+        game.hidden_set.discard(index)
+        step = -1
+    else:
+        game.pokemon_set.add(index)
+        game.hidden_set.add(index)
+        step = 1
+    for i in solver.neighbours(index):
+        game.counts[i] += step
+        solver.constraints.pop(i, None)
+        if game.cells[i] < CELL_UNEXPOSED:
+            game.cells[i] = game.counts[i]
+            solver.frontier.add(i)
+            solver.work.add(i)
+
+
+def perturb(solver, zone, rng):
+    '''
+    change the layout where the solver is stuck. the unexposed neighbours of a frontier tile are all cleared,
+    or all filled with pokemon, by moving pokemon from or to other unexposed tiles, so the tile could be deduced.
+
+    only unexposed tiles are changed. every deduction made before used a tile whose unexposed neighbours were all
+    resolved, or the difference of two tiles which both count the changed tile, so it is still right with the
+    new counts and the solver could go on instead of starting again
+
+    :param solver: a Solver stuck on the board
+    :param zone: the indexes which must not hide a pokemon
+    :param rng: the random generator
+    :return: True if the layout was changed, False if no frontier tile could be changed
+    '''
+    game = solver.game
+    cells = game.cells
+    unknown = [index for index, code in enumerate(cells) if code == CELL_UNEXPOSED and index not in zone]
+    # tiles away from the exposed ones are moved first, so fewer counts change
+    rng.shuffle(unknown)
+    unknown.sort(key=lambda index: any(cells[i] < CELL_UNEXPOSED for i in solver.neighbours(index)))
+
+    frontier = list(solver.frontier)
+    rng.shuffle(frontier)
+    for index in frontier:
+        unexposed, remaining = solver.constraint(index)
+        unexposed -= zone
+        if not unexposed:
+            continue
+        inside = [i for i in unexposed if i in game.pokemon_set]
+        free = [i for i in unknown if i not in unexposed and i not in game.pokemon_set]
+        taken = [i for i in unknown if i not in unexposed and i in game.pokemon_set]
+        empty = [i for i in unexposed if i not in game.pokemon_set]
+        clear = len(inside) <= len(free)
+        fill = len(empty) <= len(taken)
+        if clear and (not fill or len(inside) <= len(empty)):
+            moves = inside + free[:len(inside)]
+        elif fill:
+            moves = empty + taken[:len(empty)]
+        else:
+            continue
+        for i in moves:
+            toggle(solver, i)
+        return True
+    return False
+
+
+def generate_no_guess(grid_size, num_pokemon, first, rng=random, attempts=ATTEMPTS):
+    '''
+    generate pokemon which could all be found by deduction after the first click. a random layout is played by
+    a solver from the first click, and when the solver is stuck the layout is changed there and the solver goes on
+
+    :param grid_size: the size of the board
+    :param num_pokemon: the number of pokemon
+    :param first: the index of the first clicked tile
+    :param rng: the random generator
+    :param attempts: the number of new layouts tried if a layout could not be changed any more
+    :return: a list of the indexes of pokemon. if no layout without guesses was found, for example on a tiny
+             crowded board, the last layout is returned, which is still safe at the first click
+    '''
+    zone = safe_zone(grid_size, num_pokemon, first)
+    tiles = [index for index in range(grid_size ** 2) if index not in zone]
+    pokemon = []
+    for _ in range(attempts):
+        pokemon = rng.sample(tiles, num_pokemon)
+        game = BoardModel(grid_size, num_pokemon, pokemon)
+        solver = Solver(game, rng)
+        solver.expose(first)
+        while not deduce(solver):
+            if not perturb(solver, zone, rng):
+                break
+        else:
+            return sorted(game.pokemon_set)
+    return sorted(pokemon)
+
+
+class NoGuessBoard(BoardModel):
+    '''
+    A BoardModel whose pokemon are placed at the first left click, so the first click never loses
+    and the game could be finished without guessing
+
+    Attribution:
+        random: the random generator to place pokemon
+        layout: the indexes of the pokemon placed at the first click, like the ones of a recording,
+                or None to generate them
+        placed: determine if the pokemon were placed
+    '''
+
+    def __init__(self, grid_size, num_pokemon, rng=None, seed=None):
+        '''
+        To construct a board without pokemon. they are placed at the first left click
+
+        :param grid_size: the size of the game
+        :param num_pokemon: the number of pokemon hidden in the game board
+        :param rng: a random.Random to place pokemon. the global random module is used by default
+        :param seed: the seed of a new random.Random to place pokemon, instead of rng
+        '''
+        if num_pokemon >= grid_size ** 2:
+            raise ValueError('a no guess board needs at least one tile without a pokemon for the first click')
+        super().__init__(grid_size, num_pokemon, pokemon=(), seed=seed)
+        if seed is not None:
+            rng = random.Random(seed)
+        self.random = rng if rng is not None else random
+        self.layout = None
+        self.placed = False
+
+    def place(self, position):
+        '''
+        place the pokemon for the first click. the tiles caught before are kept
+
+        :param position: the position of the first clicked tile
+        '''
+        if self.layout is not None:
+            self.arrange(self.layout)
+        else:
+            self.arrange(generate_no_guess(self.grid_size, self.num_pokemon, self.position_to_index(position),
+                                           self.random))
+
+    def arrange(self, pokemon):
+        '''
+        put the pokemon on the board, like at the first click. the tiles caught before are kept
+
+        :param pokemon: the indexes of the pokemon
+        '''
+        self.pokemon = pokemon
+        self.hidden_set = {index for index in self.pokemon_set if self.cells[index] != CELL_FLAG}
+        self.placed = True
+
+    def unplace(self):
+        '''
+        take the pokemon away, so they are placed again at the next first click, like when the first click
+        is undone. the tiles caught before are kept
+        '''
+        self.pokemon = ()
+        self.hidden_set = set()
+        self.placed = False
+
+    def left_click(self, position: tuple):
+        '''
+        place the pokemon at the first click on an unexposed tile, then click like a BoardModel. a click on a
+        caught tile does nothing, so it does not place them
+
+        :param position: a tuple like (x, y)
+        :return: a list of the positions of the tiles changed
+        '''
+        if not self.placed and self.isWorking and self.get_item(position) == UNEXPOSED:
+            self.place(position)
+        return super().left_click(position)
+
+    def check_win(self):
+        '''
+        the game could not be won before the pokemon are placed
+        :return: if it is win would return True, if not, it return False
+        '''
+        return self.placed and super().check_win()
@@ -0,0 +1,319 @@
+'''
+    The recording of a game and a headless replay of it. a seeded board is generated again and the recorded moves
+    are played on it as fast as possible, so the time of a won game could be checked. the state of the game is kept
+    as a keyframe every some moves, so seeking to a move only replays the moves after the keyframe before it.
+    the pokemon of a NoGuessBoard are placed at the first click, so they are recorded after the moves and placed
+    again from the recording instead of being generated again
+
+    usage: python -m pokemon_core.replay game.pkr --seek 100
+'''
+import argparse
+import bisect
+import struct
+import time
+
+from .engine import EVENT_MOVE, ACTION_LEFT, ACTION_RIGHT, ACTION_RESET, BoardModel
+from .noguess import NoGuessBoard
+
+MAGIC = b'PKMNRPLY'
+VERSION = 1
+# magic, version, board, grid_size, num_pokemon, seed, the number of moves
+HEADER = struct.Struct('<8sHHIIQI')
+# action, x, y, milliseconds from the beginning of the recording
+RECORD = struct.Struct('<c3xIII')
+# the number of placed pokemon after the moves, then the index of every one of them
+PLACED = struct.Struct('<I')
+ACTION_CODES = {ACTION_LEFT: b'L', ACTION_RIGHT: b'R', ACTION_RESET: b'S'}
+CODE_ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+# the classes of the games which could be replayed
+BOARDS = (BoardModel, NoGuessBoard)
+# the number of moves between two keyframes
+KEYFRAME_EVERY = 64
+
+
+class Recording(object):
+    '''
+    To record the moves of a seeded game
+
+    Attribution:
+        board: the class of the game
+        grid_size: the size of the game
+        num_pokemon: the number of pokemon
+        seed: the seed of the game
+        moves: a list of tuples of the action, the position and the milliseconds from the beginning
+        pokemon: a list of the indexes of the pokemon placed at the first click of a NoGuessBoard, or None
+        game: the game being recorded, or None
+        start: the time when the recording began
+        undone: determine if a click was undone or redone. such a game could not be replayed
+    '''
+
+    def __init__(self, board, grid_size, num_pokemon, seed, moves=None, pokemon=None):
+        '''
+        :param board: BoardModel or NoGuessBoard
+        :param grid_size: the size of the game
+        :param num_pokemon: the number of pokemon
+        :param seed: the seed of the game
+        :param moves: the moves recorded before
+        :param pokemon: the pokemon placed at the first click recorded before
+        '''
+        self.board = board
+        self.grid_size = grid_size
+        self.num_pokemon = num_pokemon
+        self.seed = seed
+        self.moves = moves if moves is not None else []
+        self.pokemon = pokemon
+        self.game = None
+        self.start = time.monotonic()
+        self.undone = False
+
+    def attach(self, game: BoardModel):
+        '''
+        start recording the moves of a game. the game should be new
+
+        :param game: the game generated from the seed of the recording
+        '''
+        self.game = game
+        self.start = time.monotonic()
+        game.subscribe(EVENT_MOVE, self.record)
+
+    def detach(self):
+        '''
+        stop recording
+        '''
+        if self.game is not None:
+            self.game.unsubscribe(EVENT_MOVE, self.record)
+            self.game = None
+
+    def record(self, action, position, changed=None):
+        '''
+        record a move. it is called by the game after every move
+
+        :param action: the action of the move
+        :param position: a tuple like (x, y), or None
+        :param changed: a list of the positions changed. it is not used
+        '''
+        if action not in ACTION_CODES:
+            self.undone = True
+            return
+        self.moves.append((action, position, int((time.monotonic() - self.start) * 1000)))
+        if self.pokemon is None and getattr(self.game, 'placed', False):
+            self.pokemon = sorted(self.game.pokemon_set)
+
+    def new_game(self):
+        '''
+        :return: a new game generated from the seed. the pokemon of a NoGuessBoard are placed as recorded
+        '''
+        game = self.board(self.grid_size, self.num_pokemon, seed=self.seed)
+        if self.pokemon is not None:
+            game.layout = self.pokemon
+        return game
+
+    def pack(self):
+        '''
+        :return: the bytes of the recording
+        '''
+        if self.undone:
+            raise ValueError('a game with undone clicks could not be replayed')
+        data = bytearray(HEADER.pack(MAGIC, VERSION, BOARDS.index(self.board), self.grid_size, self.num_pokemon,
+                                     self.seed, len(self.moves)))
+        for action, position, milliseconds in self.moves:
+            x, y = position if position is not None else (0, 0)
+            data += RECORD.pack(ACTION_CODES[action], x, y, milliseconds)
+        pokemon = self.pokemon if self.pokemon is not None else ()
+        data += PLACED.pack(len(pokemon))
+        data += struct.pack(f'<{len(pokemon)}I', *pokemon)
+        return bytes(data)
+
+
+def record_game(game: BoardModel):
+    '''
+    start recording a new seeded game
+
+    :param game: the game. it must be generated from a seed
+    :return: the Recording
+    '''
+    if game.seed is None or type(game) not in BOARDS:
+        raise ValueError('only a new seeded BoardModel or NoGuessBoard could be recorded')
+    recording = Recording(type(game), game.grid_size, game.num_pokemon, game.seed)
+    recording.attach(game)
+    return recording
+
+
+def unpack_recording(data):
+    '''
+    :param data: the bytes made by Recording.pack
+    :return: the Recording
+    '''
+    magic, version, board, grid_size, num_pokemon, seed, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'it is not a recording of version {VERSION}')
+    end = HEADER.size + count * RECORD.size
+    if len(data) < end + PLACED.size:
+        raise ValueError('the recording has a wrong length')
+    placed, = PLACED.unpack_from(data, end)
+    if len(data) != end + PLACED.size + placed * 4:
+        raise ValueError('the recording has a wrong length')
+    moves = []
+    for code, x, y, milliseconds in RECORD.iter_unpack(memoryview(data)[HEADER.size:end]):
+        action = CODE_ACTIONS[code]
+        moves.append((action, (x, y) if action != ACTION_RESET else None, milliseconds))
+    pokemon = list(struct.unpack_from(f'<{placed}I', data, end + PLACED.size)) if placed else None
+    return Recording(BOARDS[board], grid_size, num_pokemon, seed, moves, pokemon)
+
+
+def save_recording(path, recording: Recording):
+    '''
+    :param path: the path of the file
+    :param recording: the Recording
+    '''
+    with open(path, 'wb') as file:
+        file.write(recording.pack())
+
+
+def load_recording(path):
+    '''
+    :param path: the path of the file
+    :return: the Recording
+    '''
+    with open(path, 'rb') as file:
+        return unpack_recording(file.read())
+
+
+class Replay(object):
+    '''
+    To replay a Recording without a window. a keyframe is kept every some moves the first time they are played
+
+    Attribution:
+        recording: the Recording
+        game: the game being replayed
+        played: the number of moves played on the game
+        keyframe_every: the number of moves between two keyframes
+        keyframes: a list of the number of moves played at every keyframe
+        states: a list of the state of the game at every keyframe
+    '''
+
+    def __init__(self, recording: Recording, keyframe_every=KEYFRAME_EVERY):
+        '''
+        :param recording: the Recording
+        :param keyframe_every: the number of moves between two keyframes
+        '''
+        self.recording = recording
+        self.game = recording.new_game()
+        self.played = 0
+        self.keyframe_every = keyframe_every
+        self.keyframes = [0]
+        self.states = [self.save_state()]
+
+    def save_state(self):
+        '''
+        :return: a tuple of everything a move could change. the pokemon and the counts are only replaced,
+                 never changed, so they are kept without copying
+        '''
+        game = self.game
+        return (bytes(game.cells), frozenset(game.hidden_set), game.pokemon_set, game.counts, game.left_pokemon,
+                game.correct_flags, game.wrong_flags, game.revealed, game.loss, game.isWorking, game.state,
+                getattr(game, 'placed', True),
+                game.random.getstate() if isinstance(game, NoGuessBoard) else None)
+
+    def load_state(self, state):
+        '''
+        :param state: a tuple made by save_state
+        '''
+        game = self.game
+        (cells, hidden, game.pokemon_set, game.counts, game.left_pokemon, game.correct_flags, game.wrong_flags,
+         game.revealed, game.loss, game.isWorking, game.state, placed, random_state) = state
+        game.cells[:] = cells
+        game.hidden_set = set(hidden)
+        if isinstance(game, NoGuessBoard):
+            game.placed = placed
+            game.random.setstate(random_state)
+
+    def step(self):
+        '''
+        play the next move, and keep a keyframe after it if it is the first time
+        '''
+        action, position, _ = self.recording.moves[self.played]
+        if action == ACTION_RESET:
+            self.game.reset_game()
+        else:
+            getattr(self.game, action)(position)
+        self.played += 1
+        if self.played % self.keyframe_every == 0 and self.played > self.keyframes[-1]:
+            self.keyframes.append(self.played)
+            self.states.append(self.save_state())
+
+    def seek(self, move):
+        '''
+        change the game to the state after a move. the game starts from the nearest keyframe before the move
+        if it is nearer than the current state
+
+        :param move: the number of moves played, from 0 to the number of recorded moves
+        :return: the game
+        '''
+        if not 0 <= move <= len(self.recording.moves):
+            raise IndexError(f'move {move} is out of the recording')
+        keyframe = bisect.bisect_right(self.keyframes, move) - 1
+        if move < self.played or self.keyframes[keyframe] > self.played:
+            self.load_state(self.states[keyframe])
+            self.played = self.keyframes[keyframe]
+        while self.played < move:
+            self.step()
+        return self.game
+
+    def run(self):
+        '''
+        play all the moves
+
+        :return: the game
+        '''
+        return self.seek(len(self.recording.moves))
+
+    def won_time(self):
+        '''
+        play all the moves and find the time of the won game, from the last restart to the last move
+
+        :return: the milliseconds spent, or None if the game was not won
+        '''
+        game = self.run()
+        if game.loss or game.isWorking:
+            return None
+        begin = 0
+        for action, _, milliseconds in self.recording.moves:
+            if action == ACTION_RESET:
+                begin = milliseconds
+        return self.recording.moves[-1][2] - begin
+
+    def verify(self, seconds, tolerance=1):
+        '''
+        check the time of a score. it is right if the game was won and took the seconds. the timer of the window
+        does not start at the same moment as the recording, so a small difference is allowed
+
+        :param seconds: the seconds of the score
+        :param tolerance: the most seconds of difference allowed
+        :return: True if the score is right
+        '''
+        milliseconds = self.won_time()
+        return milliseconds is not None and abs(milliseconds // 1000 - seconds) <= tolerance
+
+
+def main():
+    '''
+    To replay a recording from the command line
+    '''
+    parser = argparse.ArgumentParser(description='Replay a recorded game.')
+    parser.add_argument('path', help='the recording')
+    parser.add_argument('--seek', type=int, default=None, help='show the board after this number of moves')
+    args = parser.parse_args()
+
+    replay = Replay(load_recording(args.path))
+    start = time.perf_counter()
+    milliseconds = replay.won_time()
+    elapsed = time.perf_counter() - start
+    print(f'{len(replay.recording.moves)} moves replayed in {elapsed * 1000:.1f}ms')
+    print('not won' if milliseconds is None else f'won in {milliseconds / 1000:.3f}s')
+    if args.seek is not None:
+        print(replay.seek(args.seek))
+
+
+if __name__ == '__main__':
+    main()
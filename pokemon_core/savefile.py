@@ -0,0 +1,199 @@
+'''
+    The saved game file. it is a binary file of a header, a bitmap of the pokemon, the codes of the tiles packed
+    two in a byte, and a checksum. the old text files, a json of the repr of every attribution, could still be
+    loaded, but nothing in them is run by eval
+'''
+import ast
+import json
+import os
+import struct
+import zlib
+
+from .engine import CELL_FLAG, CELL_POKEMON, BoardModel, count_neighbours
+from .noguess import NoGuessBoard
+
+MAGIC = b'PKMNSAVE'
+VERSION = 1
+# magic, version, options, grid_size, num_pokemon, left_pokemon, time
+HEADER = struct.Struct('<8sHHIIiI')
+CHECKSUM = struct.Struct('<I')
+# the option of a NoGuessBoard whose pokemon are not placed yet
+OPTION_UNPLACED = 1
+# the options of a finished game. its pokemon are shown, so the result could not be found from the tiles
+OPTION_LOST = 2
+OPTION_WON = 4
+# the tables turning a byte of 0 or 1 into its bit in a byte of the bitmap, and back
+BIT_TABLES = tuple(bytes((value & 1) << bit for value in range(256)) for bit in range(8))
+BYTE_TABLES = tuple(bytes((value >> bit) & 1 for value in range(256)) for bit in range(8))
+# the tables turning a byte of two packed codes into the first or the second code
+LOW_TABLE = bytes(value & 15 for value in range(256))
+HIGH_TABLE = bytes(value >> 4 for value in range(256))
+
+
+def pack_bits(flags):
+    '''
+    :param flags: a bytearray of 0 or 1 for every tile
+    :return: the bytes of a bitmap. the bit k of the byte j is the tile 8 * j + k
+    '''
+    size = -(-len(flags) // 8)
+    flags = flags + bytes(8 * size - len(flags))
+    bitmap = 0
+    for bit in range(8):
+        bitmap |= int.from_bytes(flags[bit::8].translate(BIT_TABLES[bit]), 'little')
+    return bitmap.to_bytes(size, 'little')
+
+
+def unpack_bits(bitmap, length):
+    '''
+    :param bitmap: the bytes of a bitmap made by pack_bits
+    :param length: the number of tiles
+    :return: a bytearray of 0 or 1 for every tile
+    '''
+    flags = bytearray(8 * len(bitmap))
+    for bit in range(8):
+        flags[bit::8] = bitmap.translate(BYTE_TABLES[bit])
+    del flags[length:]
+    return flags
+
+
+def find_all(data, value):
+    '''
+    :param data: a bytearray
+    :param value: a byte
+    :return: a list of the indexes of the value in the data
+    '''
+    found, index = [], data.find(value)
+    while index >= 0:
+        found.append(index)
+        index = data.find(value, index + 1)
+    return found
+
+
+def pack_cells(cells):
+    '''
+    :param cells: the codes of the tiles. every code is smaller than 16
+    :return: the bytes of the codes packed two in a byte, the first one in the low half
+    '''
+    size = -(-len(cells) // 2)
+    low = int.from_bytes(cells[0::2], 'little')
+    high = int.from_bytes(cells[1::2], 'little')
+    return (low | high << 4).to_bytes(size, 'little')
+
+
+def unpack_cells(packed, length):
+    '''
+    :param packed: the bytes made by pack_cells
+    :param length: the number of tiles
+    :return: a bytearray of the codes of the tiles
+    '''
+    cells = bytearray(2 * len(packed))
+    cells[0::2] = packed.translate(LOW_TABLE)
+    cells[1::2] = packed.translate(HIGH_TABLE)
+    del cells[length:]
+    return cells
+
+
+def pack_game(game: BoardModel, time=0):
+    '''
+    :param game: the running game
+    :param time: the seconds played
+    :return: the bytes of the saved game
+    '''
+    size = game.grid_size ** 2
+    options = OPTION_UNPLACED if not getattr(game, 'placed', True) else 0
+    if game.loss:
+        options |= OPTION_LOST
+    elif not game.isWorking:
+        options |= OPTION_WON
+    flags = bytearray(size)
+    for index in game.pokemon_set:
+        flags[index] = 1
+    data = b''.join((HEADER.pack(MAGIC, VERSION, options, game.grid_size, game.num_pokemon, game.left_pokemon, time),
+                     pack_bits(flags), pack_cells(game.cells)))
+    return data + CHECKSUM.pack(zlib.crc32(data))
+
+
+def unpack_game(data):
+    '''
+    :param data: the bytes of a saved game, or of an old text file
+    :return: a tuple of a new BoardModel of the game and the seconds played
+    '''
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        return unpack_legacy(data)
+    view = memoryview(data)
+    if len(view) < HEADER.size + CHECKSUM.size:
+        raise ValueError('the saved game is cut short')
+    magic, version, options, grid_size, num_pokemon, left_pokemon, time = HEADER.unpack_from(view)
+    if version != VERSION:
+        raise ValueError(f'the saved game is of version {version}, not {VERSION}')
+    size = grid_size ** 2
+    bitmap_end = HEADER.size + -(-size // 8)
+    cells_end = bitmap_end + -(-size // 2)
+    if len(view) != cells_end + CHECKSUM.size:
+        raise ValueError('the saved game has a wrong length')
+    if CHECKSUM.unpack_from(view, cells_end)[0] != zlib.crc32(view[:cells_end]):
+        raise ValueError('the saved game is broken')
+
+    flags = unpack_bits(view[HEADER.size:bitmap_end].tobytes(), size)
+    pokemon = find_all(flags, 1)
+    cells = unpack_cells(view[bitmap_end:cells_end].tobytes(), size)
+    if max(cells, default=0) > CELL_POKEMON:
+        raise ValueError('the saved game has a wrong tile code')
+    # the pokemon of a NoGuessBoard are not in the bitmap before they are placed
+    if len(pokemon) != (0 if options & OPTION_UNPLACED else num_pokemon):
+        raise ValueError('the saved game has a wrong number of pokemon')
+    if options & OPTION_UNPLACED:
+        game = NoGuessBoard(grid_size, num_pokemon)
+    else:
+        game = BoardModel(grid_size, num_pokemon, pokemon, count_neighbours(flags, grid_size))
+    game.cells[:] = cells
+    # a pokemon still hides if its tile is not caught or shown
+    game.hidden_set = game.pokemon_set - set(find_all(game.cells, CELL_FLAG) + find_all(game.cells, CELL_POKEMON))
+    game.left_pokemon = left_pokemon
+    game.recount()
+    game.loss = bool(options & OPTION_LOST)
+    game.isWorking = not options & (OPTION_LOST | OPTION_WON)
+    return game, time
+
+
+def unpack_legacy(data):
+    '''
+    read an old text file, a json of the repr of every attribution. the reprs are read as literals
+
+    :param data: the bytes of the file
+    :return: a tuple of a new BoardModel of the game and the seconds played
+    '''
+    content = json.loads(bytes(data).decode('utf-8'))
+    saved = content['game']
+    pokemon = ast.literal_eval(saved['pokemon_list'])
+    game = BoardModel(int(saved['grid_size']), len(pokemon), pokemon)
+    game.hidden_pokemon = ast.literal_eval(saved['hidden_pokemon'])
+    game.displayBoard = ast.literal_eval(saved['board'])
+    game.left_pokemon = int(saved['left_pokemon'])
+    return game, int(content['panel']['time'])
+
+
+def save_game(path, game: BoardModel, time=0):
+    '''
+    write a saved game. it is written to a temporary file first, so a failed save never breaks an old file
+
+    :param path: the path of the file
+    :param game: the running game
+    :param time: the seconds played
+    :return: the bytes written
+    '''
+    data = pack_game(game, time)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(data)
+    os.replace(temporary, path)
+    return data
+
+
+def load_game(path):
+    '''
+    :param path: the path of a saved game or an old text file
+    :return: a tuple of a new BoardModel of the game and the seconds played
+    '''
+    with open(path, 'rb') as file:
+        return unpack_game(file.read())
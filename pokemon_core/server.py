@@ -0,0 +1,377 @@
+'''
+    An asyncio server hosting many games at once. a client sends a json object on every line and gets a json
+    object back on a line. a request has an id, which is sent back with the response, and an op:
+
+        {"id": 1, "op": "new", "level": 9}                           -> {"id": 1, "ok": true, "session": "..."}
+        {"id": 2, "op": "click", "session": "...", "x": 0, "y": 0}   -> {"id": 2, "ok": true, "changed": [[x, y, code]]}
+        {"id": 3, "op": "flag", "session": "...", "x": 1, "y": 1}
+        {"id": 4, "op": "save", "session": "..."}                    -> {"id": 4, "ok": true, "data": "<base64>"}
+        {"id": 5, "op": "close", "session": "..."}
+
+    the code of a tile is 0 to 8 for an exposed tile, then CELL_UNEXPOSED, CELL_FLAG and CELL_POKEMON. a failed
+    request gets {"id": ..., "ok": false, "error": "..."}. the requests of a connection are handled in order, and
+    the next line is not read before the response is written, so a client reading slowly slows down itself only.
+    a big board, or a no guess board before its pokemon are placed, is played in a worker thread, so a long flood
+    or placement does not stop the event loop serving the other games. the games not used for some time are removed
+
+    usage: python -m pokemon_core.server --port 8765
+'''
+import argparse
+import asyncio
+import base64
+import functools
+import json
+import random
+import secrets
+import time
+
+from .engine import LEVELS, BoardModel, level_board
+from .noguess import NoGuessBoard
+from .savefile import pack_game
+
+HOST = '127.0.0.1'
+PORT = 8765
+# the seconds a game is kept without requests
+IDLE_TIMEOUT = 300
+# the most games hosted at once
+MAX_SESSIONS = 100000
+# the longest request in bytes
+MAX_LINE = 64 * 1024
+# the bytes of responses waiting to be sent before the server stops reading the connection
+WRITE_BUFFER = 256 * 1024
+# the biggest board of a new game
+MAX_GRID_SIZE = 1000
+# the biggest no guess board. placing its pokemon takes longer than linear time in its tiles
+MAX_NO_GUESS_GRID_SIZE = 100
+# the biggest board played on the event loop. the moves of a bigger board take a few milliseconds or more,
+# so they are made in a worker thread
+INLINE_GRID_SIZE = 50
+
+
+def integer(request, key):
+    '''
+    :param request: the dictionary of a request
+    :param key: the name of a field
+    :return: the integer of the field. a number like 1.5 or Infinity, or true, is not an integer
+    '''
+    value = request[key]
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f'{key} must be an integer')
+    return value
+
+
+class Session(object):
+    '''
+    A game hosted by the server
+
+    Attribution:
+        game: the BoardModel of the game
+        started: the monotonic clock when the game began
+        used: the monotonic clock of the last request of the game
+        lock: the asyncio.Lock held while the game is played, so a worker thread never plays it with another
+    '''
+
+    def __init__(self, game: BoardModel):
+        '''
+        :param game: the game
+        '''
+        self.game = game
+        self.started = self.used = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def inline(self):
+        '''
+        :return: True if the game could be played on the event loop, False if it is played in a worker thread
+        '''
+        return self.game.grid_size <= INLINE_GRID_SIZE and getattr(self.game, 'placed', True)
+
+
+class GameServer(object):
+    '''
+    To host games for the clients of a json lines protocol
+
+    Attribution:
+        sessions: a dictionary from the id of a session to the Session
+        idle_timeout: the seconds a game is kept without requests
+        max_sessions: the most games hosted at once
+        server: the asyncio server, or None before it starts
+        evictor: the task removing the idle games, or None
+        connections: a dictionary from the asyncio.StreamWriter of an open connection to the task handling it
+        starting: the number of new games being generated in a worker thread. they are counted as sessions
+        requests: the number of requests handled
+        evicted: the number of games removed because they were idle
+    '''
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS):
+        '''
+        :param idle_timeout: the seconds a game is kept without requests
+        :param max_sessions: the most games hosted at once
+        '''
+        self.sessions = {}
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.server = None
+        self.evictor = None
+        self.connections = {}
+        self.starting = 0
+        self.requests = 0
+        self.evicted = 0
+
+    async def start(self, host=HOST, port=PORT):
+        '''
+        start listening and removing the idle games
+
+        :param host: the address to listen on
+        :param port: the port to listen on. 0 chooses a free port
+        :return: the port listened on
+        '''
+        self.server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+        self.evictor = asyncio.get_running_loop().create_task(self.evict_forever())
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        '''
+        stop listening, close the open connections and forget all the games
+        '''
+        if self.evictor is not None:
+            self.evictor.cancel()
+            self.evictor = None
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        # the handlers read the end of their streams and finish by themselves
+        for writer in list(self.connections):
+            writer.close()
+        await asyncio.gather(*self.connections.values(), return_exceptions=True)
+        self.sessions.clear()
+
+    async def evict_forever(self):
+        '''
+        remove the idle games a few times in every idle timeout
+        '''
+        while True:
+            await asyncio.sleep(self.idle_timeout / 4)
+            self.evict()
+
+    def evict(self, now=None):
+        '''
+        remove the games which were not used for the idle timeout
+
+        :param now: the monotonic clock. it is read by default
+        :return: the number of games removed
+        '''
+        deadline = (now if now is not None else time.monotonic()) - self.idle_timeout
+        idle = [key for key, session in self.sessions.items() if session.used < deadline]
+        for key in idle:
+            del self.sessions[key]
+        self.evicted += len(idle)
+        return len(idle)
+
+    async def handle_connection(self, reader, writer):
+        '''
+        handle the requests of a connection in order until it is closed
+
+        :param reader: the asyncio.StreamReader of the connection
+        :param writer: the asyncio.StreamWriter of the connection
+        '''
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER)
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # the line is longer than MAX_LINE, so the rest of the stream could not be read
+                    writer.write(self.encode({'id': None, 'ok': False, 'error': 'the request is too long'}))
+                    break
+                if not line:
+                    break
+                writer.write(await self.handle_line(line))
+                # wait while the client does not read the responses
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self.connections[writer]
+            writer.close()
+
+    def encode(self, response):
+        '''
+        :param response: a dictionary
+        :return: the bytes of the line of the response
+        '''
+        return json.dumps(response, separators=(',', ':')).encode('utf-8') + b'\n'
+
+    async def handle_line(self, line):
+        '''
+        :param line: the bytes of a request
+        :return: the bytes of the line of the response
+        '''
+        self.requests += 1
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('a request must be a json object')
+        except ValueError as error:
+            return self.encode({'id': None, 'ok': False, 'error': str(error)})
+        response = {'id': request.get('id')}
+        try:
+            response.update(await self.handle_request(request))
+            response['ok'] = True
+        except (KeyError, TypeError, ValueError) as error:
+            response['ok'] = False
+            response['error'] = error.args[0] if isinstance(error, ValueError) and error.args else repr(error)
+        if len(response.get('changed', ())) > INLINE_GRID_SIZE ** 2:
+            # the response of a big flood takes as long to encode as the flood itself
+            return await asyncio.get_running_loop().run_in_executor(None, self.encode, response)
+        return self.encode(response)
+
+    async def handle_request(self, request):
+        '''
+        :param request: the dictionary of a request
+        :return: a dictionary of the result
+        '''
+        op = request.get('op')
+        if op == 'new':
+            return await self.new(request)
+        session = self.session(request)
+        if op in ('click', 'flag'):
+            return await self.play(session, self.click, session, op, request)
+        if op == 'save':
+            return await self.play(session, self.save, session)
+        if op == 'close':
+            del self.sessions[request['session']]
+            return {}
+        raise ValueError(f'unknown op {op!r}')
+
+    def session(self, request):
+        '''
+        :param request: a request with the id of a session
+        :return: the Session. its last use is now
+        '''
+        session = self.sessions.get(request.get('session'))
+        if session is None:
+            raise ValueError('no such session. it may have been removed after being idle')
+        session.used = time.monotonic()
+        return session
+
+    async def play(self, session, function, *args):
+        '''
+        call a function playing the game of a session. the games played on the event loop are called at once,
+        and the others in a worker thread. the calls of one game are made one at a time
+
+        :param session: the Session
+        :param function: the function
+        :return: the result of the function
+        '''
+        async with session.lock:
+            if session.inline():
+                return function(*args)
+            return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    async def new(self, request):
+        '''
+        start a new game of a level, or of a size and a number of pokemon. a big board is generated in a worker
+        thread
+
+        :param request: a request with a level, or a grid_size and num_pokemon, and an optional seed and no_guess
+        :return: a dictionary of the id of the session and the board
+        '''
+        if len(self.sessions) + self.starting >= self.max_sessions:
+            raise ValueError('too many sessions')
+        seed = integer(request, 'seed') if request.get('seed') is not None else random.getrandbits(32)
+        board = NoGuessBoard if request.get('no_guess') else BoardModel
+        if 'level' in request:
+            level = request['level']
+            if not isinstance(level, int) or isinstance(level, bool) or level not in LEVELS:
+                raise ValueError(f'the level must be one of {list(LEVELS)}')
+            game = level_board(level, board, seed)
+        else:
+            grid_size, num_pokemon = integer(request, 'grid_size'), integer(request, 'num_pokemon')
+            if not 0 < grid_size <= MAX_GRID_SIZE or not 0 < num_pokemon < grid_size ** 2:
+                raise ValueError('the size or the number of pokemon is out of range')
+            if board is NoGuessBoard and grid_size > MAX_NO_GUESS_GRID_SIZE:
+                raise ValueError(f'a no guess board could be {MAX_NO_GUESS_GRID_SIZE} tiles wide at most')
+            if grid_size <= INLINE_GRID_SIZE:
+                game = board(grid_size, num_pokemon, seed=seed)
+            else:
+                # the place of the game is kept while it is generated, so the new games meanwhile are refused
+                self.starting += 1
+                try:
+                    game = await asyncio.get_running_loop().run_in_executor(
+                        None, functools.partial(board, grid_size, num_pokemon, seed=seed))
+                finally:
+                    self.starting -= 1
+        key = secrets.token_hex(8)
+        self.sessions[key] = Session(game)
+        return {'session': key, 'grid_size': game.grid_size, 'num_pokemon': game.num_pokemon, 'seed': seed}
+
+    def click(self, session, op, request):
+        '''
+        left click or right click a tile. a finished game could not be clicked any more
+
+        :param session: the Session
+        :param op: 'click' or 'flag'
+        :param request: a request with x and y
+        :return: a dictionary of the tiles changed, the state of the game and the number of left pokemon
+        '''
+        game = session.game
+        if game.loss or not game.isWorking:
+            raise ValueError('the game is over')
+        position = (integer(request, 'x'), integer(request, 'y'))
+        if not game.is_on_board(position):
+            raise ValueError('the position is out of the board')
+        changed = game.left_click(position) if op == 'click' else game.right_click(position)
+        # a lost game is frozen like in the window
+        game.check_lose()
+        cells, grid_size = game.cells, game.grid_size
+        state = 'lost' if game.loss else 'won' if not game.isWorking else 'playing'
+        return {'changed': [[x, y, cells[x * grid_size + y]] for x, y in changed], 'state': state,
+                'left_pokemon': game.left_pokemon}
+
+    def save(self, session):
+        '''
+        :param session: the Session
+        :return: a dictionary of the saved game in base64
+        '''
+        data = pack_game(session.game, int(time.monotonic() - session.started))
+        return {'data': base64.b64encode(data).decode('ascii')}
+
+
+async def serve(host=HOST, port=PORT, idle_timeout=IDLE_TIMEOUT, max_sessions=MAX_SESSIONS):
+    '''
+    run a server until it is cancelled
+
+    :param host: the address to listen on
+    :param port: the port to listen on
+    :param idle_timeout: the seconds a game is kept without requests
+    :param max_sessions: the most games hosted at once
+    '''
+    server = GameServer(idle_timeout, max_sessions)
+    port = await server.start(host, port)
+    print(f'serving on {host}:{port}', flush=True)
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    '''
+    To run the server from the command line
+    '''
+    parser = argparse.ArgumentParser(description='Host many pokemon games over a json lines protocol.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT,
+                        help='the seconds a game is kept without requests')
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS, help='the most games hosted at once')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.idle_timeout, args.max_sessions))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+'''
+    A Monte Carlo simulator playing many games of every level on a pool of processes.
+    Only the totals of every level are kept and written to a summary file, so a run could be stopped
+    and continued later
+
+    usage: python -m pokemon_core.simulate --games 1000000 --output summary.json
+'''
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+
+from .engine import LEVELS, level_board
+from .solver import Solver
+
+# the totals recorded for every level
+TOTALS = ('games', 'won', 'first_click_lost', 'moves', 'guesses', 'revealed', 'seconds')
+
+
+class SimpleSolver(Solver):
+    '''
+    A weaker policy which only uses the single tile rules and guesses a random tile
+    '''
+
+    def check_subsets(self):
+        '''
+        the subset rule is not used by the simple policy
+        :return: False
+        '''
+        return False
+
+    def guess(self):
+        '''
+        :return: the index of a random unexposed tile
+        '''
+        self.guesses += 1
+        return self.random_outside({})
+
+
+POLICIES = {'solver': Solver, 'simple': SimpleSolver}
+
+
+def play_batch(task):
+    '''
+    play a batch of games of a level. it runs in a worker process
+
+    :param task: a tuple of the level, the index of the batch, the number of games played in the batch before,
+                 the number of games, the policy and the seed
+    :return: a tuple of the level, the index of the batch and a dictionary of totals
+    '''
+    level, batch, played, games, policy, seed = task
+    # every batch has its own seed, so a continued run plays the same games
+    random.seed(f'{seed}-{level}-{batch}-{played}')
+    totals = dict.fromkeys(TOTALS, 0)
+    for _ in range(games):
+        start = time.perf_counter()
+        solver = POLICIES[policy](level_board(level))
+        won = solver.solve()
+        totals['seconds'] += time.perf_counter() - start
+        totals['games'] += 1
+        totals['won'] += won
+        totals['first_click_lost'] += not won and solver.moves == 1
+        totals['moves'] += solver.moves
+        totals['guesses'] += solver.guesses
+        totals['revealed'] += solver.revealed
+    return level, batch, totals
+
+
+def load_summary(path, policy, seed, batch_size):
+    '''
+    read the summary of an earlier run to continue it
+
+    :param path: the path of the summary file
+    :param policy: the name of the policy
+    :param seed: the seed of the run
+    :param batch_size: the number of games in a batch
+    :return: the summary. it is empty if there is no file
+    '''
+    summary = {'policy': policy, 'seed': seed, 'batch_size': batch_size, 'levels': {}}
+    if os.path.exists(path):
+        with open(path, 'r') as file:
+            summary = json.load(file)
+        if (summary['policy'], summary['seed'], summary['batch_size']) != (policy, seed, batch_size):
+            raise ValueError(f'{path} was written by another policy, seed or batch size')
+    return summary
+
+
+def save_summary(path, summary):
+    '''
+    write the summary. it is written to a temporary file first, so a stopped run never leaves half a file
+
+    :param path: the path of the summary file
+    :param summary: the summary
+    '''
+    for level in summary['levels'].values():
+        games = level['games'] or 1
+        level['win_rate'] = level['won'] / games
+        level['first_click_loss_rate'] = level['first_click_lost'] / games
+        level['mean_moves'] = level['moves'] / games
+        level['mean_revealed'] = level['revealed'] / games
+        level['mean_seconds'] = level['seconds'] / games
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(summary, file, indent=2)
+    os.replace(temporary, path)
+
+
+def simulate(games, levels=LEVELS, policy='solver', batch_size=1000, workers=None, output='summary.json',
+             seed=0, save_every=5):
+    '''
+    play games of every level on a pool of processes and record the totals
+
+    :param games: the number of games of every level
+    :param levels: the levels to play
+    :param policy: 'solver' or 'simple'
+    :param batch_size: the number of games played by a worker at a time
+    :param workers: the number of processes. it is the number of cores by default
+    :param output: the path of the summary file. the games recorded in it are not played again
+    :param seed: the seed of the run
+    :param save_every: the most seconds between two writes of the summary
+    :return: the summary
+    '''
+    summary = load_summary(output, policy, seed, batch_size)
+    tasks = []
+    for level in levels:
+        record = summary['levels'].setdefault(str(level), dict(dict.fromkeys(TOTALS, 0), batches={}))
+        for batch in range(-(-games // batch_size)):
+            played = record['batches'].get(str(batch), 0)
+            size = min(batch_size, games - batch * batch_size) - played
+            if size > 0:
+                tasks.append((level, batch, played, size, policy, seed))
+
+    saved = time.monotonic()
+    with multiprocessing.Pool(workers) as pool:
+        for level, batch, totals in pool.imap_unordered(play_batch, tasks):
+            record = summary['levels'][str(level)]
+            for key in TOTALS:
+                record[key] += totals[key]
+            record['batches'][str(batch)] = record['batches'].get(str(batch), 0) + totals['games']
+            if time.monotonic() - saved > save_every:
+                save_summary(output, summary)
+                saved = time.monotonic()
+    save_summary(output, summary)
+    return summary
+
+
+def main():
+    '''
+    To run the simulator from the command line
+    '''
+    parser = argparse.ArgumentParser(description='Play many games of every level and record the statistics.')
+    parser.add_argument('--games', type=int, default=10000, help='the number of games of every level')
+    parser.add_argument('--levels', type=int, nargs='+', default=list(LEVELS), help='the levels to play')
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='solver')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None, help='the number of processes')
+    parser.add_argument('--output', default='summary.json', help='the summary file. an existing one is continued')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = simulate(args.games, args.levels, args.policy, args.batch_size, args.workers, args.output, args.seed)
+    print(f'{time.perf_counter() - start:.1f}s')
+    for level, record in sorted(summary['levels'].items(), key=lambda item: int(item[0])):
+        print(f"level {level}: {record['games']} games, {record['win_rate']:.1%} won, "
+              f"{record['first_click_loss_rate']:.1%} lost at the first click, {record['mean_moves']:.1f} moves")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+'''
+    An auto-solver playing a BoardModel to the end through left_click and right_click.
+    It only reads the exposed tiles, like a player would
+'''
+import random
+
+from .engine import CELL_UNEXPOSED, CELL_FLAG, BoardModel
+
+# the neighbours of the tiles for every size of board, shared by all solvers. a tile is added when first needed
+NEIGHBOURS = {}
+
+
+class Solver(object):
+    '''
+    To play a game by constraint propagation. single tile rules are used first, then the subset rule
+    between two neighbouring tiles, and a tile is guessed only when nothing could be deduced
+
+    the solver keeps its knowledge between moves. only the tiles changed by a move and their neighbours
+    are checked again, instead of the whole board
+
+    Attribution:
+        game: the BoardModel being played
+        random: the random generator used to guess
+        frontier: the indexes of exposed tiles which still have unexposed neighbours
+        work: the indexes of frontier tiles whose neighbours changed since they were checked
+        safe: the indexes of tiles deduced without pokemon and waiting for exposing
+        constraints: a dictionary from the index of an exposed tile to its constraint for the subset rule.
+                     a constraint is removed when a neighbour of the tile changes, and found again when needed
+        unknown: the number of tiles neither exposed nor caught
+        moves: the number of clicks used
+        guesses: the number of tiles guessed
+        revealed: the number of tiles exposed
+        adjacent: a dictionary from the index of a tile to its neighbours on boards of this size
+    '''
+
+    def __init__(self, game: BoardModel, rng=None):
+        '''
+        To construct a Solver class for a running game
+
+        :param game: the BoardModel to play
+        :param rng: a random.Random to guess tiles. the global random module is used by default
+        '''
+        self.game = game
+        self.random = rng if rng is not None else random
+        self.frontier = set()
+        self.work = set()
+        self.safe = set()
+        self.constraints = {}
+        self.unknown = 0
+        self.moves = self.guesses = self.revealed = 0
+        self.adjacent = NEIGHBOURS.setdefault(game.grid_size, {})
+        self.observe_board()
+
+    def observe_board(self):
+        '''
+        read the whole board once to learn the exposed tiles, like a saved game
+        '''
+        cells = self.game.cells
+        self.unknown = cells.count(CELL_UNEXPOSED)
+        for index, code in enumerate(cells):
+            if code < 9 and any(cells[i] == CELL_UNEXPOSED for i in self.neighbours(index)):
+                self.frontier.add(index)
+                self.work.add(index)
+
+    def neighbours(self, index):
+        '''
+        :param index: the index of a tile
+        :return: a tuple of the indexes of the tiles surrounding it
+        '''
+        result = self.adjacent.get(index)
+        if result is None:
+            grid_size = self.game.grid_size
+            x, y = index // grid_size, index % grid_size
+            result = self.adjacent[index] = tuple(i * grid_size + j
+                                                  for i in range(max(x - 1, 0), min(x + 2, grid_size))
+                                                  for j in range(max(y - 1, 0), min(y + 2, grid_size))
+                                                  if i != x or j != y)
+        return result
+
+    def is_over(self):
+        '''
+        :return: True if the game is won or lost
+        '''
+        return self.game.loss or not self.game.isWorking
+
+    def solve(self):
+        '''
+        play the game until it is won or lost
+
+        :return: True if the game is won
+        '''
+        while not self.is_over():
+            self.step()
+        return not self.game.loss
+
+    def step(self):
+        '''
+        do one move: expose a safe tile, catch a pokemon, or guess if nothing could be deduced
+        '''
+        while not self.safe:
+            if self.work:
+                self.check_tile(self.work.pop())
+            elif not (self.check_subsets() or self.check_remaining()):
+                self.expose(self.guess())
+                return
+            if self.is_over():
+                return
+        index = self.safe.pop()
+        if self.game.cells[index] == CELL_UNEXPOSED:
+            self.expose(index)
+
+    def expose(self, index):
+        '''
+        left click a tile and learn the exposed tiles
+
+        :param index: the index of the tile
+        '''
+        self.moves += 1
+        changed = self.game.left_click(self.game.index_to_position(index))
+        if self.game.loss:
+            return
+        for position in changed:
+            changed_index = self.game.position_to_index(position)
+            if changed_index in self.game.pokemon_set:
+                # the pokemon are shown when the last safe tile is exposed
+                continue
+            self.unknown -= 1
+            self.revealed += 1
+            self.safe.discard(changed_index)
+            # a zero tile could still have unexposed neighbours on its corners
+            self.frontier.add(changed_index)
+            self.work.add(changed_index)
+            self.constraints.pop(changed_index, None)
+            for i in self.neighbours(changed_index):
+                self.constraints.pop(i, None)
+                if i in self.frontier:
+                    self.work.add(i)
+
+    def catch(self, index):
+        '''
+        right click a tile deduced with a pokemon
+
+        :param index: the index of the tile
+        '''
+        if self.game.cells[index] != CELL_UNEXPOSED:
+            return
+        self.moves += 1
+        self.unknown -= 1
+        self.game.right_click(self.game.index_to_position(index))
+        for i in self.neighbours(index):
+            self.constraints.pop(i, None)
+            if i in self.frontier:
+                self.work.add(i)
+
+    def constraint(self, index):
+        '''
+        :param index: the index of an exposed tile
+        :return: a tuple of the set of its unexposed neighbours and the number of pokemon still hidden in them
+        '''
+        cells = self.game.cells
+        unexposed, remaining = set(), cells[index]
+        for i in self.neighbours(index):
+            if cells[i] == CELL_UNEXPOSED:
+                unexposed.add(i)
+            elif cells[i] == CELL_FLAG:
+                remaining -= 1
+        return unexposed, remaining
+
+    def check_tile(self, index):
+        '''
+        the single tile rules. if no pokemon is left around the tile, all its unexposed neighbours are safe.
+        if the number of pokemon left equals the unexposed neighbours, all of them are pokemon
+
+        :param index: the index of an exposed tile
+        :return: True if something was deduced
+        '''
+        unexposed, remaining = self.constraint(index)
+        if not unexposed:
+            self.frontier.discard(index)
+            return False
+        if remaining == 0:
+            self.safe.update(unexposed)
+            self.frontier.discard(index)
+            return True
+        if remaining == len(unexposed):
+            self.frontier.discard(index)
+            for i in unexposed:
+                self.catch(i)
+            return True
+        return False
+
+    def check_subsets(self):
+        '''
+        the subset rule. if the unexposed neighbours of tile A are a part of those of a nearby tile B,
+        the rest of B's neighbours hide the difference of their pokemon
+
+        :return: True if something was deduced
+        '''
+        constraints, frontier = self.constraints, self.frontier
+        for index in frontier:
+            if index not in constraints:
+                constraints[index] = self.constraint(index)
+        grid_size = self.game.grid_size
+        for index in frontier:
+            unexposed, remaining = constraints[index]
+            if not unexposed:
+                continue
+            x, y = index // grid_size, index % grid_size
+            for i in range(max(x - 2, 0), min(x + 3, grid_size)):
+                for j in range(max(y - 2, 0), min(y + 3, grid_size)):
+                    other_index = i * grid_size + j
+                    if other_index not in frontier:
+                        continue
+                    other = constraints[other_index]
+                    if not unexposed < other[0]:
+                        continue
+                    rest, rest_remaining = other[0] - unexposed, other[1] - remaining
+                    if rest_remaining == 0:
+                        self.safe.update(rest)
+                        return True
+                    if rest_remaining == len(rest):
+                        for k in rest:
+                            self.catch(k)
+                        return True
+        return False
+
+    def check_remaining(self):
+        '''
+        the global rule. if the number of pokemon left equals the unexposed tiles, all of them are pokemon
+
+        :return: True if something was deduced
+        '''
+        left = self.game.get_num_pokemon() - self.game.get_num_attempted_catches()
+        if left != self.unknown:
+            return False
+        for index, code in enumerate(self.game.cells):
+            if code == CELL_UNEXPOSED:
+                self.catch(index)
+        return True
+
+    def guess(self):
+        '''
+        choose the unexposed tile least likely to hide a pokemon. the chance of a tile next to the frontier
+        is estimated by its neighbours, and any other tile has the chance of the whole board
+
+        :return: the index of the chosen tile
+        '''
+        self.guesses += 1
+        chances = {}
+        for index in self.frontier:
+            unexposed, remaining = self.constraint(index)
+            for i in unexposed:
+                chances[i] = max(chances.get(i, 0), remaining / len(unexposed))
+
+        left = self.game.get_num_pokemon() - self.game.get_num_attempted_catches()
+        outside = self.unknown - len(chances)
+        if outside > 0:
+            density = max(left - sum(chances.values()), 0) / outside
+            if not chances or density < min(chances.values()):
+                return self.random_outside(chances)
+        return min(chances, key=chances.get)
+
+    def random_outside(self, chances):
+        '''
+        :param chances: the unexposed tiles next to the frontier
+        :return: the index of a random unexposed tile not next to the frontier
+        '''
+        cells = self.game.cells
+        for _ in range(32):
+            index = self.random.randrange(len(cells))
+            if cells[index] == CELL_UNEXPOSED and index not in chances:
+                return index
+        candidates = [index for index, code in enumerate(cells) if code == CELL_UNEXPOSED and index not in chances]
+        return self.random.choice(candidates)
+
+
+def solve(game: BoardModel, rng=None):
+    '''
+    play a game to the end with a Solver
+
+    :param game: the BoardModel to play
+    :param rng: a random.Random to guess tiles
+    :return: the Solver after playing
+    '''
+    solver = Solver(game, rng)
+    solver.solve()
+    return solver
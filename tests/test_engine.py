@@ -0,0 +1,70 @@
+'''
+    The tests of the counts and the board views of BoardModel
+'''
+import random
+import unittest
+
+from pokemon_core.engine import BoardModel, FLAG, UNEXPOSED, CELL_FLAG, count_neighbours
+
+
+def slow_counts(grid_size, pokemon):
+    '''
+    :return: the counts of a board found by checking the neighbours of every tile
+    '''
+    counts = bytearray(grid_size ** 2)
+    for index in range(grid_size ** 2):
+        x, y = divmod(index, grid_size)
+        counts[index] = sum(i * grid_size + j in pokemon
+                            for i in range(max(x - 1, 0), min(x + 2, grid_size))
+                            for j in range(max(y - 1, 0), min(y + 2, grid_size))
+                            if (i, j) != (x, y))
+    return counts
+
+
+class CountTest(unittest.TestCase):
+
+    def test_generate_counts(self):
+        rng = random.Random(0)
+        for _ in range(100):
+            grid_size = rng.randint(1, 20)
+            pokemon = rng.sample(range(grid_size ** 2), rng.randint(0, grid_size ** 2))
+            game = BoardModel(grid_size, len(pokemon), pokemon)
+            self.assertEqual(game.counts, slow_counts(grid_size, game.pokemon_set))
+
+    def test_many_boards(self):
+        boards = [BoardModel(7, 10) for _ in range(5)]
+        flags = bytearray(b''.join(bytes(i in game.pokemon_set for i in range(49)) for game in boards))
+        self.assertEqual(count_neighbours(flags, 7), b''.join(game.counts for game in boards))
+
+
+class BoardGridTest(unittest.TestCase):
+
+    def setUp(self):
+        self.game = BoardModel(5, 3)
+        self.board = self.game.displayBoard
+
+    def test_negative_index(self):
+        self.board[-1][-1] = FLAG
+        self.assertEqual(self.game.cells[24], CELL_FLAG)
+        self.assertEqual(self.board[4][4], FLAG)
+        self.assertEqual(self.board[-5][-5], UNEXPOSED)
+
+    def test_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.board[5]
+        with self.assertRaises(IndexError):
+            self.board[0][-6]
+
+    def test_slices(self):
+        self.board[1][1:3] = [FLAG, FLAG]
+        self.assertEqual(self.board[1][:], [UNEXPOSED, FLAG, FLAG, UNEXPOSED, UNEXPOSED])
+        self.assertEqual([list(row) for row in self.board[1:3]], self.board.tolist()[1:3])
+        self.assertEqual(self.board[1][::-2], [UNEXPOSED, FLAG, UNEXPOSED])
+
+    def test_slice_keeps_size(self):
+        with self.assertRaises(ValueError):
+            self.board[0][0:2] = [FLAG]
+
+
+if __name__ == '__main__':
+    unittest.main()
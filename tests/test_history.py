@@ -0,0 +1,112 @@
+'''
+    The tests of the undo and redo of clicks
+'''
+import random
+import unittest
+
+from pokemon_core import BoardModel, NoGuessBoard, History, CELL_FLAG, CELL_UNEXPOSED, level_board
+
+
+def snapshot(game):
+    '''
+    :return: a tuple of everything a click could change
+    '''
+    return (bytes(game.cells), frozenset(game.hidden_set), frozenset(game.pokemon_set), game.left_pokemon,
+            game.correct_flags, game.wrong_flags, game.revealed, game.loss, game.isWorking, game.state,
+            getattr(game, 'placed', True))
+
+
+class HistoryTest(unittest.TestCase):
+
+    def assertConsistent(self, game):
+        # the counters of a finished game are not counted again, because its pokemon are all shown
+        if game.loss or not game.isWorking:
+            return
+        state = snapshot(game)
+        game.recount()
+        self.assertEqual(snapshot(game), state)
+        self.assertEqual(game.hidden_set, {i for i in game.pokemon_set if game.cells[i] == CELL_UNEXPOSED})
+        self.assertEqual(game.left_pokemon, game.num_pokemon - game.cells.count(CELL_FLAG))
+
+    def play(self, board, games, practice):
+        rng = random.Random(board.__name__)
+        for seed in range(games):
+            grid_size = rng.randint(3, 12)
+            game = board(grid_size, rng.randint(1, grid_size ** 2 // 4), seed=seed)
+            history = History(practice=practice)
+            history.attach(game)
+            states = [snapshot(game)]
+            for _ in range(rng.randint(1, 40)):
+                if game.loss or not game.isWorking:
+                    break
+                position = (rng.randrange(grid_size), rng.randrange(grid_size))
+                if (game.right_click if rng.random() < 0.35 else game.left_click)(position):
+                    states.append(snapshot(game))
+            self.assertEqual(len(history.done), len(states) - 1)
+            if not practice and (game.loss or not game.isWorking):
+                self.assertFalse(history.can_undo())
+                self.assertEqual(history.undo(), [])
+                continue
+            for state in reversed(states[:-1]):
+                history.undo()
+                self.assertEqual(snapshot(game), state)
+                self.assertConsistent(game)
+            self.assertFalse(history.can_undo())
+            for state in states[1:]:
+                history.redo()
+                self.assertEqual(snapshot(game), state)
+                self.assertConsistent(game)
+            self.assertFalse(history.can_redo())
+
+    def test_board(self):
+        self.play(BoardModel, 300, practice=False)
+
+    def test_board_practice(self):
+        self.play(BoardModel, 300, practice=True)
+
+    def test_no_guess_board(self):
+        self.play(NoGuessBoard, 300, practice=True)
+
+    def test_new_click_clears_redo(self):
+        game = BoardModel(10, 10, seed=1)
+        history = History()
+        history.attach(game)
+        game.right_click((0, 0))
+        game.right_click((1, 1))
+        history.undo()
+        self.assertTrue(history.can_redo())
+        game.right_click((2, 2))
+        self.assertFalse(history.can_redo())
+
+    def test_limit(self):
+        game = BoardModel(10, 10, seed=1)
+        history = History(limit=3)
+        history.attach(game)
+        for y in range(5):
+            game.right_click((0, y))
+        self.assertEqual(len(history.done), 3)
+
+    def test_undo_first_click_of_no_guess_board(self):
+        for seed in range(50):
+            game = level_board(9, NoGuessBoard, seed)
+            history = History(practice=True)
+            history.attach(game)
+            game.right_click((3, 3))
+            game.left_click((0, 0))
+            layout = game.pokemon
+            history.undo()
+            self.assertFalse(game.placed)
+            self.assertEqual(game.pokemon_set, set())
+            history.redo()
+            self.assertEqual(game.pokemon, layout)
+            history.undo()
+            # the first click is protected again, wherever it is
+            game.left_click((9, 9))
+            self.assertFalse(game.loss)
+            self.assertTrue(game.placed)
+            self.assertNotIn(game.position_to_index((9, 9)), game.pokemon_set)
+            self.assertConsistent(game)
+
+
+if __name__ == '__main__':
+    unittest.main()
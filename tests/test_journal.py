@@ -0,0 +1,77 @@
+'''
+    The tests of the autosave journal and the saved game
+'''
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+
+from pokemon_core import BoardModel, NoGuessBoard
+from pokemon_core.journal import Journal, restore
+from pokemon_core.savefile import CHECKSUM, HEADER, pack_game, unpack_game
+
+
+def sign(data):
+    '''
+    :param data: a saved game changed after packing
+    :return: the bytes of the saved game with its checksum written again
+    '''
+    data = bytes(data[:-CHECKSUM.size])
+    return data + CHECKSUM.pack(zlib.crc32(data))
+
+
+class JournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_first_click_wins(self):
+        # the only pokemon is caught before the first click places it, so the first click wins
+        won = 0
+        for seed in range(30):
+            path = os.path.join(self.directory, f'{seed}.pkm')
+            game = NoGuessBoard(2, 1, seed=seed)
+            journal = Journal(path, snapshot_every=3)
+            journal.attach(game)
+            game.right_click((0, 1))
+            game.left_click((0, 0))
+            journal.detach()
+            restored, _ = restore(path)
+            won += not game.isWorking
+            self.assertEqual((restored.loss, restored.isWorking), (game.loss, game.isWorking))
+            self.assertEqual(restored.cells, game.cells)
+        self.assertTrue(won)
+
+
+class SaveFileTest(unittest.TestCase):
+
+    def test_result_is_saved(self):
+        game = BoardModel(5, 3, seed=1)
+        game.left_click(game.index_to_position(min(game.pokemon_set)))
+        game.check_lose()
+        restored, _ = unpack_game(pack_game(game))
+        self.assertTrue(restored.loss)
+        self.assertFalse(restored.isWorking)
+        playing, _ = unpack_game(pack_game(BoardModel(5, 3, seed=1)))
+        self.assertFalse(playing.loss)
+        self.assertTrue(playing.isWorking)
+
+    def test_wrong_code(self):
+        data = bytearray(pack_game(BoardModel(5, 3, [0, 7, 12])))
+        # the last byte of the codes holds the last tile in its low half
+        data[-CHECKSUM.size - 1] = 12
+        with self.assertRaises(ValueError):
+            unpack_game(sign(data))
+
+    def test_wrong_number_of_pokemon(self):
+        data = bytearray(pack_game(BoardModel(5, 3, [0, 7, 12])))
+        magic, version, options, grid_size, num_pokemon, left_pokemon, time = HEADER.unpack_from(data)
+        HEADER.pack_into(data, 0, magic, version, options, grid_size, 4, left_pokemon, time)
+        with self.assertRaises(ValueError):
+            unpack_game(sign(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
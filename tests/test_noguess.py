@@ -0,0 +1,38 @@
+'''
+    The tests of NoGuessBoard
+'''
+import unittest
+
+from pokemon_core.engine import level_board
+from pokemon_core.noguess import NoGuessBoard
+
+
+class NoGuessBoardTest(unittest.TestCase):
+
+    def test_first_click_is_safe(self):
+        for seed in range(50):
+            game = level_board(9, NoGuessBoard, seed)
+            game.left_click((9, 9))
+            self.assertFalse(game.loss)
+            self.assertTrue(game.placed)
+
+    def test_click_on_flag_does_not_place(self):
+        for seed in range(50):
+            game = level_board(9, NoGuessBoard, seed)
+            game.right_click((0, 0))
+            self.assertEqual(game.left_click((0, 0)), [])
+            self.assertFalse(game.placed)
+            game.left_click((9, 9))
+            self.assertFalse(game.loss)
+            self.assertNotIn(game.position_to_index((9, 9)), game.pokemon_set)
+
+    def test_full_board(self):
+        with self.assertRaises(ValueError):
+            NoGuessBoard(3, 9)
+        game = NoGuessBoard(3, 8, seed=1)
+        game.left_click((1, 1))
+        self.assertFalse(game.loss)
+
+
+if __name__ == '__main__':
+    unittest.main()
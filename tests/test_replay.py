@@ -0,0 +1,76 @@
+'''
+    The tests of the recording and the replay of games
+'''
+import random
+import unittest
+
+from pokemon_core.engine import BoardModel, level_board
+from pokemon_core.noguess import NoGuessBoard
+from pokemon_core.replay import PLACED, Replay, record_game, unpack_recording
+
+
+def play(game, rng, moves=60):
+    '''
+    play random clicks and flags on a game. a flagged tile is sometimes clicked at once
+    '''
+    grid_size = game.grid_size
+    for _ in range(moves):
+        position = (rng.randrange(grid_size), rng.randrange(grid_size))
+        if rng.random() < 0.3:
+            game.right_click(position)
+            if rng.random() < 0.5:
+                game.left_click(position)
+        else:
+            game.left_click(position)
+        if game.loss or not game.isWorking:
+            if rng.random() < 0.5:
+                break
+            game.reset_game()
+
+
+class ReplayTest(unittest.TestCase):
+
+    def assertSameGame(self, game, replayed):
+        self.assertEqual(replayed.pokemon_set, game.pokemon_set)
+        self.assertEqual(replayed.hidden_set, game.hidden_set)
+        self.assertEqual(replayed.cells, game.cells)
+        self.assertEqual((replayed.loss, replayed.isWorking, replayed.left_pokemon),
+                         (game.loss, game.isWorking, game.left_pokemon))
+
+    def round_trip(self, board, games=100):
+        rng = random.Random(0)
+        for seed in range(games):
+            game = level_board(rng.choice((3, 6, 9)), board, seed)
+            recording = record_game(game)
+            play(game, rng)
+            replay = Replay(unpack_recording(recording.pack()), keyframe_every=8)
+            self.assertSameGame(game, replay.run())
+            # seeking back to a keyframe and forward again gives the same game
+            replay.seek(len(recording.moves) // 2)
+            self.assertSameGame(game, replay.run())
+
+    def test_board(self):
+        self.round_trip(BoardModel)
+
+    def test_no_guess_board(self):
+        self.round_trip(NoGuessBoard)
+
+    def test_placed_after_flag(self):
+        game = NoGuessBoard(10, 18, seed=1)
+        recording = record_game(game)
+        game.right_click((0, 0))
+        game.left_click((0, 0))
+        game.left_click((5, 5))
+        unpacked = unpack_recording(recording.pack())
+        self.assertEqual(unpacked.pokemon, sorted(game.pokemon_set))
+        self.assertSameGame(game, Replay(unpacked).run())
+
+    def test_wrong_length(self):
+        data = record_game(BoardModel(6, 5, seed=3)).pack()
+        for wrong in (data[:-PLACED.size], data + bytes(4)):
+            with self.assertRaises(ValueError):
+                unpack_recording(wrong)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+'''
+    The tests of the game server, talking to it over a local connection
+'''
+import asyncio
+import json
+import unittest
+
+from pokemon_core.server import GameServer
+
+
+class ServerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = GameServer()
+        port = await self.server.start(port=0)
+        # the response of a big flood is a long line
+        self.reader, self.writer = await asyncio.open_connection('127.0.0.1', port, limit=1 << 24)
+        self.ids = 0
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.server.close()
+
+    async def request(self, op, **params):
+        self.ids += 1
+        self.writer.write(json.dumps(dict(params, id=self.ids, op=op)).encode('utf-8') + b'\n')
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        self.assertEqual(response['id'], self.ids)
+        return response
+
+    async def new(self, **params):
+        response = await self.request('new', **params)
+        self.assertTrue(response['ok'], response)
+        return response['session']
+
+    async def test_play(self):
+        session = await self.new(level=9, seed=1)
+        game = self.server.sessions[session].game
+        x, y = next(game.index_to_position(i) for i in range(game.grid_size ** 2) if i not in game.pokemon_set)
+        response = await self.request('click', session=session, x=x, y=y)
+        self.assertTrue(response['ok'])
+        self.assertIn([x, y, game.cells[x * game.grid_size + y]], response['changed'])
+        response = await self.request('save', session=session)
+        self.assertTrue(response['ok'])
+        self.assertTrue((await self.request('close', session=session))['ok'])
+        self.assertFalse((await self.request('flag', session=session, x=0, y=0))['ok'])
+
+    async def test_lost_game_is_frozen(self):
+        session = await self.new(level=9, seed=1)
+        game = self.server.sessions[session].game
+        x, y = game.index_to_position(min(game.pokemon_set))
+        response = await self.request('click', session=session, x=x, y=y)
+        self.assertEqual(response['state'], 'lost')
+        revealed = game.revealed
+        for op in ('click', 'flag'):
+            response = await self.request(op, session=session, x=0, y=0)
+            self.assertFalse(response['ok'])
+            self.assertEqual(response['error'], 'the game is over')
+        self.assertEqual(game.revealed, revealed)
+
+    async def test_bad_requests(self):
+        session = await self.new(level=3)
+        for params in ({'op': 'nope'}, {'op': 'click', 'session': 'nope', 'x': 0, 'y': 0},
+                       {'op': 'click', 'session': session, 'x': 99, 'y': 0},
+                       {'op': 'new', 'grid_size': 5}, {'op': 'new', 'level': 9.0}):
+            response = await self.request(**params)
+            self.assertFalse(response['ok'])
+            self.assertIsInstance(response['error'], str)
+
+    async def test_numbers(self):
+        session = await self.new(level=3)
+        for line in (f'{{"id": 1, "op": "click", "session": "{session}", "x": Infinity, "y": 0}}',
+                     f'{{"id": 1, "op": "flag", "session": "{session}", "x": 1.5, "y": 0}}',
+                     f'{{"id": 1, "op": "click", "session": "{session}", "x": true, "y": 0}}',
+                     '{"id": 1, "op": "new", "grid_size": NaN, "num_pokemon": 3}',
+                     '{"id": 1, "op": "new", "level": 3, "seed": -Infinity}'):
+            self.writer.write(line.encode('utf-8') + b'\n')
+            response = json.loads(await self.reader.readline())
+            self.assertEqual((response['id'], response['ok']), (1, False))
+        # the connection is still served
+        self.assertTrue((await self.request('save', session=session))['ok'])
+
+    async def test_big_board_does_not_block(self):
+        session = await self.new(grid_size=100, num_pokemon=1500, no_guess=True, seed=1)
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.server.server.sockets[0].getsockname()[1])
+        self.addCleanup(writer.close)
+        # the pokemon of the big board are placed in a worker thread meanwhile
+        self.writer.write(json.dumps({'id': 1, 'op': 'click', 'session': session, 'x': 50, 'y': 50}).encode() + b'\n')
+        placing = asyncio.ensure_future(self.reader.readline())
+        await asyncio.sleep(0.01)
+        writer.write(b'{"id": 2, "op": "new", "level": 3}\n')
+        self.assertTrue(json.loads(await reader.readline())['ok'])
+        self.assertFalse(placing.done())
+        response = json.loads(await placing)
+        self.assertEqual((response['ok'], response['state']), (True, 'playing'))
+
+    async def test_limits(self):
+        for params in ({'grid_size': 1001, 'num_pokemon': 1}, {'grid_size': 101, 'num_pokemon': 1, 'no_guess': True},
+                       {'grid_size': 5, 'num_pokemon': 25}):
+            self.assertFalse((await self.request('new', **params))['ok'])
+        session = await self.new(grid_size=300, num_pokemon=1, seed=1)
+        response = await self.request('click', session=session, x=0, y=0)
+        # every tile without pokemon is exposed, then the pokemon is shown
+        self.assertEqual((response['state'], len(response['changed'])), ('won', 300 ** 2))
+
+    async def test_session_limit(self):
+        self.server.max_sessions = 1
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.server.server.sockets[0].getsockname()[1])
+        self.addCleanup(writer.close)
+        # the first board is still generated in a worker thread when the second one is asked for
+        self.writer.write(b'{"id": 1, "op": "new", "grid_size": 300, "num_pokemon": 9000}\n')
+        await asyncio.sleep(0.01)
+        writer.write(b'{"id": 2, "op": "new", "grid_size": 300, "num_pokemon": 9000}\n')
+        responses = [json.loads(line) for line in await asyncio.gather(self.reader.readline(), reader.readline())]
+        self.assertEqual([response['ok'] for response in responses], [True, False])
+        self.assertEqual(len(self.server.sessions), 1)
+
+    async def test_eviction(self):
+        session = await self.new(level=3)
+        self.assertEqual(self.server.evict(), 0)
+        self.assertEqual(self.server.evict(self.server.sessions[session].used + self.server.idle_timeout + 1), 1)
+        self.assertFalse((await self.request('save', session=session))['ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()